@@ -0,0 +1,355 @@
+"""
+Пакетное создание, изменение и удаление объектов одним запросом.
+
+Пакет передается списком объектов в JSON или построчно в NDJSON и
+проверяется целиком: если хотя бы один элемент некорректен, ничего не
+записывается, а ответ 400 содержит список ошибок по элементам в порядке
+запроса (пустой словарь для корректных элементов), как у сериализаторов
+DRF с many=True. Корректный пакет записывается в одной транзакции через
+bulk_create/bulk_update.
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import NotSupportedError, connection, transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+
+from .cache import invalidate_for_instances
+from .parsers import FastJSONParser, NDJSONParser
+
+
+def bulk_create_with_pks(model, objects):
+    """
+    bulk_create с заполнением первичных ключей объектов. SQLite в Django
+    3.2 не возвращает ключи из INSERT, поэтому для нее ключами созданных
+    объектов считаются последние ключи таблицы: вызов должен выполняться
+    в транзакции, а в SQLite одновременно пишет только одна транзакция и
+    ключи AUTOINCREMENT только возрастают. Для других СУБД без возврата
+    ключей такое предположение неверно, и вызов завершается ошибкой.
+    """
+    if (
+        not connection.features.can_return_rows_from_bulk_insert
+        and connection.vendor != 'sqlite'
+    ):
+        raise NotSupportedError(
+            'Пакетное создание требует СУБД, возвращающей первичные ключи '
+            'из INSERT.'
+        )
+    model.objects.bulk_create(objects)
+    if objects and objects[0].pk is None:
+        pks = model.objects.order_by('-pk').values_list('pk', flat=True)
+        for obj, pk in zip(objects, reversed(list(pks[:len(objects)]))):
+            obj.pk = pk
+    return objects
+
+
+def set_many_to_many(model, field_name, values):
+    """
+    Установка связей многие-ко-многим для нескольких объектов: values -
+    список пар (объект, связанные объекты). Текущие связи загружаются одним
+    запросом, лишние удаляются одним запросом, новые добавляются одним
+    bulk_create.
+    """
+    if not values:
+        return
+    field = model._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = through._meta.get_field(field.m2m_field_name()).attname
+    target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+    desired = {
+        (obj.pk, related.pk)
+        for obj, related_objects in values
+        for related in related_objects
+    }
+    existing = {
+        (source_id, target_id): pk
+        for pk, source_id, target_id in through.objects.filter(
+            **{f'{source}__in': [obj.pk for obj, _ in values]}
+        ).values_list('pk', source, target)
+    }
+    removed = [pk for pair, pk in existing.items() if pair not in desired]
+    if removed:
+        through.objects.filter(pk__in=removed).delete()
+    through.objects.bulk_create(
+        through(**{source: source_id, target: target_id})
+        for source_id, target_id in desired
+        if (source_id, target_id) not in existing
+    )
+
+
+class BulkMixin:
+    """
+    Эндпоинт `bulk/` для пакетной записи: POST создает объекты, PATCH
+    изменяет объекты, найденные по полю bulk_lookup_field (значение
+    передается в ключе bulk_lookup_name каждого элемента), DELETE удаляет
+    объекты по списку значений bulk_lookup_name.
+
+    Поля PreloadedSlugRelatedField всех элементов разрешаются одним
+    запросом на поле, уникальность полей проверяется одним запросом на
+    поле вместо запроса на каждый элемент.
+    """
+
+    bulk_lookup_field = 'pk'
+    bulk_lookup_name = 'id'
+
+    @action(
+        detail=False,
+        methods=['post', 'patch', 'delete'],
+        url_path='bulk',
+        parser_classes=(FastJSONParser, NDJSONParser),
+    )
+    def bulk(self, request, *args, **kwargs):
+        items = self.get_bulk_items(request)
+        if request.method == 'POST':
+            return self.bulk_create(items)
+        if request.method == 'PATCH':
+            return self.bulk_update(items)
+        return self.bulk_destroy(items)
+
+    def get_bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ['Ожидался список.']}
+            )
+        if len(items) > settings.API_BULK_MAX_ITEMS:
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Пакет не может содержать больше '
+                        f'{settings.API_BULK_MAX_ITEMS} элементов.'
+                    ]
+                }
+            )
+        return items
+
+    def get_bulk_model(self):
+        return self.get_queryset().model
+
+    def get_bulk_context(self, items):
+        context = self.get_serializer_context()
+        context['slug_objects'] = self.preload_slug_objects(items)
+        return context
+
+    def preload_slug_objects(self, items):
+        """Объекты для slug-полей всех элементов пакета."""
+        slug_objects = {}
+        for name, field in self.get_serializer().fields.items():
+            relation = getattr(field, 'child_relation', field)
+            if field.read_only or not hasattr(relation, 'get_slug_objects'):
+                continue
+            values = []
+            for item in items:
+                value = item.get(name) if isinstance(item, dict) else None
+                values.extend(value if isinstance(value, list) else [value])
+            slug_objects.setdefault(
+                (relation.get_queryset().model, relation.slug_field), {}
+            ).update(relation.load_slug_objects(values))
+        return slug_objects
+
+    def validate_bulk(self, serializers, errors):
+        """
+        Проверка сериализаторов пакета. Валидаторы UniqueValidator
+        заменяются одним запросом на поле для всего пакета.
+        """
+        unique_validators = {}
+        for index, serializer in enumerate(serializers):
+            if serializer is None:
+                continue
+            for name, field in serializer.fields.items():
+                validators = []
+                for validator in field.validators:
+                    if isinstance(validator, UniqueValidator):
+                        unique_validators[name] = validator
+                    else:
+                        validators.append(validator)
+                field.validators = validators
+            if not serializer.is_valid():
+                errors[index] = dict(serializer.errors)
+        for name, validator in unique_validators.items():
+            self.validate_bulk_unique(serializers, errors, name, validator)
+        if any(errors):
+            raise ValidationError(errors)
+
+    def validate_bulk_unique(self, serializers, errors, name, validator):
+        """
+        Уникальность поля name: значение не должно совпадать ни с
+        сохраненными объектами, ни с другими элементами пакета.
+        """
+        values = {}
+        for index, serializer in enumerate(serializers):
+            if errors[index] or name not in serializer.validated_data:
+                continue
+            value = serializer.validated_data[name]
+            if (
+                serializer.instance is not None
+                and getattr(serializer.instance, name) == value
+            ):
+                continue
+            values.setdefault(value, []).append(index)
+        existing = set(
+            self.get_bulk_model()
+            .objects.filter(**{f'{name}__in': values})
+            .values_list(name, flat=True)
+        )
+        for value, indexes in values.items():
+            if value not in existing:
+                indexes = indexes[1:]
+            for index in indexes:
+                errors[index][name] = [validator.message]
+
+    def split_validated_data(self, serializer):
+        """Поля модели и связи многие-ко-многим из validated_data."""
+        model = self.get_bulk_model()
+        data = dict(serializer.validated_data)
+        relations = {
+            name: data.pop(name)
+            for name in list(data)
+            if model._meta.get_field(name).many_to_many
+        }
+        return data, relations
+
+    def bulk_create(self, items):
+        context = self.get_bulk_context(items)
+        serializers = [
+            self.get_serializer(data=item, context=context) for item in items
+        ]
+        self.validate_bulk(serializers, [{} for _ in items])
+        with transaction.atomic():
+            instances = self.perform_bulk_create(serializers)
+        return Response(
+            self.get_bulk_response_data(instances),
+            status=status.HTTP_201_CREATED,
+        )
+
+    def perform_bulk_create(self, serializers):
+        model = self.get_bulk_model()
+        instances = []
+        relations = {}
+        for serializer in serializers:
+            data, instance_relations = self.split_validated_data(serializer)
+            instance = model(**data)
+            instances.append(instance)
+            for name, related in instance_relations.items():
+                relations.setdefault(name, []).append((instance, related))
+        bulk_create_with_pks(model, instances)
+        for name, values in relations.items():
+            set_many_to_many(model, name, values)
+        self.bulk_saved(instances)
+        return instances
+
+    def get_bulk_keys(self, items):
+        """
+        Значения bulk_lookup_field из элементов пакета, None для
+        элементов без корректного значения.
+        """
+        model = self.get_bulk_model()
+        field = (
+            model._meta.pk
+            if self.bulk_lookup_field == 'pk'
+            else model._meta.get_field(self.bulk_lookup_field)
+        )
+        keys = []
+        for item in items:
+            if isinstance(item, dict):
+                item = item.get(self.bulk_lookup_name)
+            try:
+                keys.append(None if item is None else field.to_python(item))
+            except (DjangoValidationError, TypeError):
+                keys.append(None)
+        return keys
+
+    def get_bulk_instances(self, items, errors):
+        """
+        Объекты для элементов пакета. Для ненайденных объектов и повторов
+        одного объекта в пакете в errors записывается ошибка элемента.
+        """
+        keys = self.get_bulk_keys(items)
+        found = self.get_queryset().in_bulk(
+            {key for key in keys if key is not None},
+            field_name=self.bulk_lookup_field,
+        )
+        instances = []
+        seen = set()
+        for index, key in enumerate(keys):
+            instances.append(found.get(key))
+            if instances[-1] is None:
+                errors[index] = {self.bulk_lookup_name: ['Объект не найден.']}
+            elif key in seen:
+                errors[index] = {
+                    self.bulk_lookup_name: ['Объект повторяется в пакете.']
+                }
+            seen.add(key)
+        return instances
+
+    def bulk_update(self, items):
+        errors = [{} for _ in items]
+        instances = self.get_bulk_instances(items, errors)
+        context = self.get_bulk_context(items)
+        serializers = [
+            None
+            if instance is None
+            else self.get_serializer(
+                instance, data=item, partial=True, context=context
+            )
+            for item, instance in zip(items, instances)
+        ]
+        self.validate_bulk(serializers, errors)
+        with transaction.atomic():
+            instances = self.perform_bulk_update(serializers)
+        return Response(self.get_bulk_response_data(instances))
+
+    def perform_bulk_update(self, serializers):
+        model = self.get_bulk_model()
+        instances = []
+        fields = set()
+        relations = {}
+        for serializer in serializers:
+            data, instance_relations = self.split_validated_data(serializer)
+            instance = serializer.instance
+            for name, value in data.items():
+                setattr(instance, name, value)
+                fields.add(name)
+            instances.append(instance)
+            for name, related in instance_relations.items():
+                relations.setdefault(name, []).append((instance, related))
+        if fields:
+            model.objects.bulk_update(instances, fields)
+        for name, values in relations.items():
+            set_many_to_many(model, name, values)
+        self.bulk_saved(instances)
+        return instances
+
+    def bulk_destroy(self, items):
+        errors = [{} for _ in items]
+        instances = self.get_bulk_instances(items, errors)
+        if any(errors):
+            raise ValidationError(errors)
+        with transaction.atomic():
+            self.get_bulk_model().objects.filter(
+                pk__in=[instance.pk for instance in instances]
+            ).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def bulk_saved(self, instances):
+        """
+        Действия после пакетной записи вместо сигналов post_save, которые
+        bulk_create и bulk_update не отправляют: сброс кэша ответов.
+        """
+        invalidate_for_instances(self.get_bulk_model(), instances)
+
+    def get_bulk_result_queryset(self):
+        return self.get_queryset()
+
+    def get_bulk_response_data(self, instances):
+        """Данные записанных объектов в порядке элементов пакета."""
+        found = self.get_bulk_result_queryset().in_bulk(
+            [instance.pk for instance in instances]
+        )
+        return self.get_serializer(
+            [found[instance.pk] for instance in instances], many=True
+        ).data
@@ -0,0 +1,353 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from reviews.models import (
+    Category,
+    Comment,
+    ContentVersion,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+)
+
+
+def get_review_namespaces(review):
+    return ('titles', f'reviews:{review.title_id}', f'comments:{review.pk}')
+
+
+def get_comment_namespaces(comment):
+    """
+    Количество комментариев выводится в отзывах, поэтому изменение
+    комментария сбрасывает и ответы со списком отзывов произведения.
+    """
+    if Comment.review.is_cached(comment):
+        title_id = comment.review.title_id
+    else:
+        title_id = (
+            Review.objects.filter(pk=comment.review_id)
+            .values_list('title_id', flat=True)
+            .first()
+        )
+    return (f'comments:{comment.review_id}', f'reviews:{title_id}')
+
+
+# Группы ответов, которые устаревают при изменении объекта модели.
+INVALIDATED_NAMESPACES = {
+    Category: lambda instance: ('categories', 'titles'),
+    Genre: lambda instance: ('genres', 'titles'),
+    Title: lambda instance: ('titles', f'reviews:{instance.pk}'),
+    GenreTitle: lambda instance: ('titles',),
+    Review: get_review_namespaces,
+    Comment: get_comment_namespaces,
+}
+
+# Группы ответов вложенных ресурсов объекта.
+OWNED_NAMESPACES = {
+    Title: lambda instance: (f'reviews:{instance.pk}',),
+    Review: lambda instance: (f'comments:{instance.pk}',),
+}
+
+# Размер пакета при создании версий групп ответов.
+CONTENT_VERSIONS_BATCH_SIZE = 500
+
+# Версия группы ответов, для которой версия в базе еще не сохранена.
+INITIAL_CONTENT_VERSION = 0
+
+
+def get_namespace_version(namespace):
+    """
+    Версия группы ответов в кэше: время последнего изменения в
+    наносекундах. Кэшированные ответы хранятся с версией в ключе, поэтому
+    смена версии делает недоступными все ответы группы. Если кэш не общий
+    для процессов (LocMemCache), другие процессы узнают о смене версии
+    только по истечении API_CACHE_TIMEOUT их записей, поэтому для
+    условных GET-запросов используются версии из базы
+    (get_content_versions).
+    """
+    key = f'api:{namespace}:version'
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate_namespace(namespace):
+    """Смена версии группы ответов в кэше."""
+    cache.set(f'api:{namespace}:version', time.time_ns(), timeout=None)
+
+
+def get_content_versions(namespaces):
+    """
+    Версии групп ответов из базы одним запросом. Для групп без сохраненной
+    версии, данные которых еще не менялись, возвращается
+    INITIAL_CONTENT_VERSION: версия создается только при записи, поэтому
+    запросы на чтение не добавляют строки в базу.
+    """
+    versions = dict(
+        ContentVersion.objects.filter(namespace__in=namespaces).values_list(
+            'namespace', 'version'
+        )
+    )
+    return [
+        versions.get(namespace, INITIAL_CONTENT_VERSION)
+        for namespace in namespaces
+    ]
+
+
+def update_content_versions(namespaces):
+    """
+    Смена версий групп ответов в базе в текущей транзакции: новая версия
+    видна другим запросам одновременно с измененными данными.
+    """
+    version = time.time_ns()
+    updated = set(
+        ContentVersion.objects.filter(namespace__in=namespaces).values_list(
+            'namespace', flat=True
+        )
+    )
+    ContentVersion.objects.filter(namespace__in=updated).update(
+        version=version
+    )
+    ContentVersion.objects.bulk_create(
+        [
+            ContentVersion(namespace=namespace, version=version)
+            for namespace in set(namespaces) - updated
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def update_all_content_versions(namespaces=()):
+    """
+    Смена версий всех групп ответов в базе, например после записи данных
+    в обход сигналов моделей. Для групп из namespaces, у которых еще нет
+    версии, версия создается.
+    """
+    version = time.time_ns()
+    ContentVersion.objects.update(version=version)
+    ContentVersion.objects.bulk_create(
+        (
+            ContentVersion(namespace=namespace, version=version)
+            for namespace in namespaces
+        ),
+        batch_size=CONTENT_VERSIONS_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def invalidate_namespaces(namespaces):
+    """
+    Сброс версий групп ответов: в базе - сразу, в кэше - после фиксации
+    транзакции, чтобы в кэш не попали данные, которые еще не видны другим
+    запросам.
+    """
+    namespaces = list(dict.fromkeys(namespaces))
+    update_content_versions(namespaces)
+    for namespace in namespaces:
+        transaction.on_commit(
+            lambda namespace=namespace: invalidate_namespace(namespace)
+        )
+
+
+def invalidate_for_instance(sender, instance):
+    """Сброс версий ответов, зависящих от объекта."""
+    invalidate_namespaces(INVALIDATED_NAMESPACES[sender](instance))
+
+
+def invalidate_for_instances(sender, instances):
+    """
+    Сброс версий ответов после пакетной записи объектов, которая не
+    отправляет сигналы моделей. Каждая группа сбрасывается один раз.
+    """
+    invalidate_namespaces(
+        namespace
+        for instance in instances
+        for namespace in INVALIDATED_NAMESPACES[sender](instance)
+    )
+
+
+def model_changed(sender, instance, **kwargs):
+    invalidate_for_instance(sender, instance)
+
+
+def model_deleted(sender, instance, **kwargs):
+    """
+    Вложенные ресурсы удаленного объекта отвечают 404, поэтому версии их
+    групп удаляются из базы, а не обновляются.
+    """
+    owned = OWNED_NAMESPACES.get(sender, lambda instance: ())(instance)
+    invalidate_namespaces(
+        namespace
+        for namespace in INVALIDATED_NAMESPACES[sender](instance)
+        if namespace not in owned
+    )
+    ContentVersion.objects.filter(namespace__in=owned).delete()
+
+
+def genres_changed(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_for_instance(Title, instance)
+
+
+for model_class in INVALIDATED_NAMESPACES:
+    post_save.connect(
+        model_changed, sender=model_class, dispatch_uid=f'cache_{model_class}'
+    )
+    post_delete.connect(
+        model_deleted, sender=model_class, dispatch_uid=f'cache_{model_class}'
+    )
+m2m_changed.connect(
+    genres_changed, sender=GenreTitle, dispatch_uid='cache_genre_title'
+)
+
+
+def get_params(request):
+    """Отсортированные параметры запроса для построения ключей."""
+    return sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists()
+    )
+
+
+class CachedResponseMixin:
+    """
+    Кэширование ответов на GET-запросы списка объектов. Ключ кэша строится
+    по адресу запроса и отсортированным параметрам (фильтры, поиск,
+    страница). Кэш сбрасывается при изменении моделей группы cache_namespace.
+    """
+
+    cache_namespace = None
+    cache_anonymous_only = False
+
+    def get_cache_key(self, request):
+        """
+        Если у view есть валидаторы условного GET, их ETag входит в ключ:
+        он построен по версиям из базы, поэтому процесс с устаревшей
+        версией в локальном кэше не отдаст устаревший ответ.
+        """
+        validators = getattr(self, 'condition_validators', None)
+        raw_key = (
+            f'{request.get_host()}{request.path}?{get_params(request)}:'
+            f'{validators[0] if validators else ""}'
+        )
+        digest = hashlib.md5(raw_key.encode('utf-8')).hexdigest()
+        version = get_namespace_version(self.cache_namespace)
+        return f'api:{self.cache_namespace}:{version}:{digest}'
+
+    def is_cacheable(self, request):
+        return not (
+            self.cache_anonymous_only and request.user.is_authenticated
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return handler(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка условных GET-запросов. ETag и Last-Modified вычисляются по
+    версиям групп ответов из get_condition_namespaces, которые хранятся
+    в базе и читаются одним запросом без сериализации. Если данные не
+    изменились, возвращается ответ 304 до выполнения запросов к данным.
+    If-None-Match: * совпадает только с существующим представлением,
+    поэтому такой запрос проверяется после выполнения view.
+    """
+
+    condition_namespaces = ()
+
+    def get_condition_namespaces(self):
+        return [
+            namespace.format(**self.kwargs)
+            for namespace in self.condition_namespaces
+        ]
+
+    def get_validators(self, request):
+        versions = get_content_versions(self.get_condition_namespaces())
+        raw_etag = (
+            f'{request.path}?{get_params(request)}:'
+            f'{request.accepted_media_type}:{versions}'
+        )
+        etag = f'"{hashlib.md5(raw_etag.encode("utf-8")).hexdigest()}"'
+        return etag, max(versions) // 10 ** 9
+
+    def get_if_none_match(self, request):
+        return {
+            value.strip().replace('W/', '', 1)
+            for value in request.headers.get('If-None-Match', '').split(',')
+            if value.strip()
+        }
+
+    def is_not_modified(self, request, etag, last_modified):
+        etags = self.get_if_none_match(request)
+        if etags:
+            return etag in etags
+        if_modified_since = parse_http_date_safe(
+            request.headers.get('If-Modified-Since', '')
+        )
+        return (
+            if_modified_since is not None
+            and last_modified <= if_modified_since
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.condition_validators = None
+        if request.method != 'GET' or not self.condition_namespaces:
+            return
+        self.condition_validators = self.get_validators(request)
+        if self.is_not_modified(request, *self.condition_validators):
+            raise NotModified()
+
+    def set_validators(self, response):
+        etag, last_modified = self.condition_validators
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        validators = getattr(self, 'condition_validators', None)
+        if (
+            validators
+            and response.status_code == status.HTTP_200_OK
+            and '*' in self.get_if_none_match(request)
+        ):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if validators and response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            self.set_validators(response)
+        return response
@@ -0,0 +1,118 @@
+"""
+Способы подсчета общего количества объектов для постраничной пагинации.
+Способ выбирается атрибутом `count_strategy` у view, по умолчанию
+выполняется точный COUNT(*). Количество только выводится в ответе:
+страницы выбираются по данным (см. PageSizePagination), поэтому
+приблизительное количество не скрывает объекты.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .cache import get_namespace_version
+
+
+class ExactCount:
+    """Точный COUNT(*) на каждый запрос."""
+
+    def count(self, queryset, view):
+        return queryset.count()
+
+
+class CachedCount(ExactCount):
+    """
+    Точный COUNT(*), сохраненный в кэше. Ключ строится по SQL запроса и
+    версиям групп ответов view (get_condition_namespaces или
+    cache_namespace), поэтому количество сбрасывается при изменении
+    моделей группы, как и кэшированные ответы.
+    """
+
+    def get_namespaces(self, view):
+        if hasattr(view, 'get_condition_namespaces'):
+            return view.get_condition_namespaces()
+        namespace = getattr(view, 'cache_namespace', None)
+        return [namespace] if namespace else []
+
+    def count(self, queryset, view):
+        namespaces = self.get_namespaces(view)
+        if not namespaces:
+            return super().count(queryset, view)
+        sql, params = queryset.query.sql_with_params()
+        versions = [
+            get_namespace_version(namespace) for namespace in namespaces
+        ]
+        raw_key = f'{sql}:{params}:{versions}'
+        key = f'api:count:{hashlib.md5(raw_key.encode("utf-8")).hexdigest()}'
+        count = cache.get(key)
+        if count is None:
+            count = super().count(queryset, view)
+            cache.set(key, count, settings.API_CACHE_TIMEOUT)
+        return count
+
+
+class StoredCount:
+    """
+    Количество, которое хранится в базе (например, количество отзывов
+    произведения), из view.get_stored_count(queryset). Если view
+    возвращает None (например, список отфильтрован), используется
+    способ fallback.
+    """
+
+    def __init__(self, fallback=None):
+        self.fallback = fallback or ExactCount()
+
+    def count(self, queryset, view):
+        count = view.get_stored_count(queryset)
+        if count is None:
+            return self.fallback.count(queryset, view)
+        return count
+
+
+def estimate_table_rows(queryset):
+    """
+    Оценка количества строк таблицы запроса по статистике СУБД без
+    COUNT(*) или None, если СУБД не ведет такой статистики. Оценка
+    хранится в кэше API_CACHE_TIMEOUT секунд.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    elif connection.vendor == 'mysql':
+        sql = (
+            'SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s'
+        )
+    else:
+        return None
+    key = f'api:estimate:{connection.alias}:{table}'
+    estimate = cache.get(key)
+    if estimate is None:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, (table,))
+            row = cursor.fetchone()
+        estimate = max(row[0], 0) if row and row[0] is not None else -1
+        cache.set(key, estimate, settings.API_CACHE_TIMEOUT)
+    return None if estimate < 0 else estimate
+
+
+class EstimatedCount:
+    """
+    Оценка количества строк по статистике СУБД для списков без фильтров,
+    если таблица больше threshold строк. Для отфильтрованных списков,
+    небольших таблиц и СУБД без статистики используется способ fallback.
+    """
+
+    def __init__(self, threshold=None, fallback=None):
+        self.threshold = threshold
+        self.fallback = fallback or ExactCount()
+
+    def count(self, queryset, view):
+        threshold = self.threshold or settings.API_ESTIMATED_COUNT_THRESHOLD
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return self.fallback.count(queryset, view)
@@ -0,0 +1,137 @@
+"""
+Потоковая выгрузка каталога в CSV и NDJSON. Ресурсы и столбцы совпадают
+с файлами, которые загружает команда load_data_from_csv, поэтому
+выгруженные CSV загружаются обратно без изменений. Строки читаются из
+базы через iterator() пакетами по API_EXPORT_CHUNK_SIZE и отдаются
+клиенту по мере чтения, поэтому память не зависит от размера таблицы.
+"""
+import csv
+import datetime
+import io
+from itertools import islice
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+from .renderers import FastJSONRenderer
+
+
+class Export:
+    """Выгрузка одной модели: столбцы в порядке файла загрузки."""
+
+    def __init__(self, model, columns):
+        self.model = model
+        self.columns = columns
+
+    def get_queryset(self):
+        return self.model.objects.order_by('pk')
+
+    def get_value_columns(self):
+        return self.columns
+
+    def get_chunks(self, chunk_size):
+        """Строки в виде словарей пакетами по chunk_size."""
+        rows = (
+            self.get_queryset()
+            .values(*self.get_value_columns())
+            .iterator(chunk_size=chunk_size)
+        )
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def get_records(self, chunk):
+        """Объекты NDJSON для пакета строк."""
+        return chunk
+
+
+class TitleExport(Export):
+    """
+    Произведения. В NDJSON к столбцам файла добавляются id жанров и
+    рейтинг: жанры пакета загружаются одним запросом. В CSV жанры
+    выгружаются отдельным ресурсом genre_title, а рейтинг
+    пересчитывается при загрузке.
+    """
+
+    def get_value_columns(self):
+        return self.columns + ('rating_sum', 'rating_count')
+
+    def get_records(self, chunk):
+        genres = {}
+        for title_id, genre_id in GenreTitle.objects.filter(
+            title_id__in=[row['id'] for row in chunk]
+        ).order_by('pk').values_list('title_id', 'genre_id'):
+            genres.setdefault(title_id, []).append(genre_id)
+        records = []
+        for row in chunk:
+            rating_sum = row.pop('rating_sum')
+            rating_count = row.pop('rating_count')
+            row['genre'] = genres.get(row['id'], [])
+            row['rating'] = (
+                rating_sum // rating_count if rating_count else None
+            )
+            records.append(row)
+        return records
+
+
+EXPORTS = {
+    'category': Export(Category, ('id', 'name', 'slug')),
+    'genre': Export(Genre, ('id', 'name', 'slug')),
+    'titles': TitleExport(
+        Title, ('id', 'name', 'year', 'category', 'description')
+    ),
+    'genre_title': Export(GenreTitle, ('id', 'title_id', 'genre_id')),
+    'users': Export(
+        User,
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+    ),
+    'review': Export(
+        Review, ('id', 'title_id', 'text', 'author', 'score', 'pub_date')
+    ),
+    'comments': Export(
+        Comment, ('id', 'review_id', 'text', 'author', 'pub_date')
+    ),
+}
+
+
+def format_csv_value(value, encoder=JSONEncoder()):
+    """Даты - в формате ответов API, None - пустая ячейка."""
+    if isinstance(value, datetime.datetime):
+        return encoder.default(value)
+    return value
+
+
+def stream_csv(export, chunk_size=None):
+    chunk_size = chunk_size or settings.API_EXPORT_CHUNK_SIZE
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(export.columns)
+    for chunk in export.get_chunks(chunk_size):
+        writer.writerows(
+            [format_csv_value(row[column]) for column in export.columns]
+            for row in chunk
+        )
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def stream_ndjson(export, chunk_size=None):
+    chunk_size = chunk_size or settings.API_EXPORT_CHUNK_SIZE
+    render = FastJSONRenderer().render
+    for chunk in export.get_chunks(chunk_size):
+        yield b''.join(
+            render(record) + b'\n' for record in export.get_records(chunk)
+        )
+
+
+STREAMS = {
+    'csv': ('text/csv; charset=utf-8', stream_csv),
+    'ndjson': ('application/x-ndjson', stream_ndjson),
+}
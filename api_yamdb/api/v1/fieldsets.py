@@ -0,0 +1,83 @@
+from rest_framework.exceptions import ValidationError
+
+
+def parse_field_names(value):
+    """Имена полей из параметра запроса вида `id,name,rating`."""
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Выборочные поля в ответах на GET-запросы: параметр fields оставляет
+    только перечисленные поля, параметр omit исключает поля. Набор полей
+    передается сериализатору через контекст, а из запроса к базе
+    исключаются колонки, JOIN и prefetch_related полей, которых нет в
+    ответе.
+
+    sparse_columns задает колонки (в формате only()) для полей
+    сериализатора, которые не совпадают с колонками модели, например
+    {'author': ('author__username',)}. Связи из путей с `__` загружаются
+    через select_related. sparse_prefetch задает prefetch_related для полей
+    со связями многие-ко-многим.
+    """
+
+    sparse_columns = {}
+    sparse_prefetch = {}
+
+    def get_sparse_fields(self):
+        """Поля ответа или None, если запрошены все поля."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        params = self.request.query_params
+        if self.request.method != 'GET' or not (
+            'fields' in params or 'omit' in params
+        ):
+            return None
+        available = set(self.get_serializer_class()().fields)
+        requested = parse_field_names(params.get('fields', ''))
+        omitted = parse_field_names(params.get('omit', ''))
+        errors = {
+            param: [
+                'Неизвестные поля: ' + ', '.join(sorted(names - available))
+            ]
+            for param, names in (('fields', requested), ('omit', omitted))
+            if names - available
+        }
+        if errors:
+            raise ValidationError(errors)
+        return (requested or available) - omitted
+
+    def get_sparse_columns(self, field):
+        return self.sparse_columns.get(field, (field,))
+
+    def prune_queryset(self, queryset):
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        columns = {queryset.model._meta.pk.name}
+        for field in fields:
+            columns.update(self.get_sparse_columns(field))
+        related = {
+            column.rsplit('__', 1)[0] for column in columns if '__' in column
+        }
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.prefetch_related(
+            *(
+                self.sparse_prefetch[field]
+                for field in fields
+                if field in self.sparse_prefetch
+            )
+        ).only(*columns)
+
+    def filter_queryset(self, queryset):
+        return self.prune_queryset(super().filter_queryset(queryset))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
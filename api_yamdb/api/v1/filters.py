@@ -1,19 +1,58 @@
+from django.db import connection
+from django.db.models import Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import StrIndex
 from django_filters import rest_framework as filters
+from reviews.indexes import (
+    TITLE_NAME_FTS_TABLE,
+    TRIGRAM_LENGTH,
+    fts_phrase,
+    title_name_fts_available,
+)
 from reviews.models import Title
 
 
 class TitleFilter(filters.FilterSet):
-    """Фильтр выборки произведений по определенным полям."""
+    """
+    Фильтр выборки произведений по определенным полям.
+    Категория и жанр сравниваются со slug целиком (или по началу slug
+    в параметрах *_prefix), что позволяет использовать индексы по slug.
+    """
 
     category = filters.CharFilter(
-        field_name='category__slug', lookup_expr='icontains'
+        field_name='category__slug', lookup_expr='exact'
     )
-    genre = filters.CharFilter(
-        field_name='genre__slug', lookup_expr='icontains'
+    category_prefix = filters.CharFilter(
+        field_name='category__slug', lookup_expr='startswith'
     )
-    name = filters.CharFilter(field_name='name', lookup_expr='contains')
+    genre = filters.CharFilter(field_name='genre__slug', lookup_expr='exact')
+    genre_prefix = filters.CharFilter(
+        field_name='genre__slug', lookup_expr='startswith'
+    )
+    name = filters.CharFilter(method='filter_name')
     year = filters.NumberFilter(field_name="year", lookup_expr='exact')
 
     class Meta:
         model = Title
         fields = ('category', 'genre', 'name', 'year')
+
+    def filter_name(self, queryset, name, value):
+        """
+        Поиск подстроки в названии с учетом регистра. В SQLite строки от
+        трех символов ищутся по триграммному FTS5-индексу, а более
+        короткие - через INSTR: LIKE в SQLite не различает регистр
+        латиницы. В PostgreSQL LIKE использует GIN-индекс pg_trgm.
+        """
+        if not title_name_fts_available(connection):
+            return queryset.filter(name__contains=value)
+        if len(value) >= TRIGRAM_LENGTH:
+            return queryset.filter(
+                id__in=RawSQL(
+                    f'SELECT rowid FROM {TITLE_NAME_FTS_TABLE} '
+                    'WHERE name MATCH %s',
+                    (fts_phrase(value),),
+                )
+            )
+        return queryset.alias(
+            name_position=StrIndex('name', Value(value))
+        ).filter(name_position__gt=0)
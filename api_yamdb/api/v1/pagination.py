@@ -0,0 +1,329 @@
+import json
+import math
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .counts import ExactCount
+
+
+class PageSizeMixin:
+    """
+    Размер страницы задается параметром `page_size`, но не больше
+    API_MAX_PAGE_SIZE. Размер страницы по умолчанию можно переопределить
+    атрибутом `page_size` у view.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def set_page_size(self, view):
+        self.page_size = getattr(view, 'page_size', None) or type(
+            self
+        ).page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.set_page_size(view)
+        return super().paginate_queryset(queryset, request, view)
+
+
+class PageSizePagination(PageSizeMixin, pagination.PageNumberPagination):
+    """
+    Постраничная пагинация по номеру страницы с настраиваемым размером
+    страницы. Страница выбирается запросом с одним лишним объектом: по
+    нему определяется наличие следующей страницы.
+
+    Общее количество объектов (ключ `count`) считается способом из
+    атрибута `count_strategy` у view (см. counts.py), по умолчанию -
+    COUNT(*). Оценка или сохраненное количество могут расходиться с
+    фактическим, поэтому количество только выводится в ответе и не
+    влияет на выбор страницы и ссылки. Параметр `count=false` (или
+    атрибут `paginate_count = False` у view) отключает подсчет: ключ
+    `count` не выводится. Параметр `page=last` выбирает последнюю страницу
+    по точному количеству объектов.
+    """
+
+    count_query_param = 'count'
+    default_count_strategy = ExactCount()
+
+    def get_with_count(self, request, view):
+        value = request.query_params.get(self.count_query_param)
+        if value is not None:
+            return value.lower() not in ('false', '0', 'no')
+        return getattr(view, 'paginate_count', True)
+
+    def get_count(self, queryset, offset, objects, page_size):
+        """
+        Количество объектов способом count_strategy, согласованное с
+        прочитанной страницей: оно не меньше числа уже увиденных
+        объектов. На последней странице количество известно без
+        подсчета.
+        """
+        if len(objects) <= page_size:
+            return offset + len(objects)
+        strategy = getattr(
+            self.view, 'count_strategy', None
+        ) or self.default_count_strategy
+        return max(strategy.count(queryset, self.view), offset + len(objects))
+
+    def get_page_number(self, request, queryset, page_size):
+        """
+        Номер страницы из запроса. Для last_page_strings ('last') номер
+        последней страницы вычисляется по точному количеству объектов.
+        """
+        value = request.query_params.get(self.page_query_param, 1)
+        if value in self.last_page_strings:
+            return max(math.ceil(queryset.count() / page_size), 1)
+        try:
+            page_number = int(value)
+            if page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=value,
+                    message='Неверный номер страницы.',
+                )
+            )
+        return page_number
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        self.with_count = self.get_with_count(request, view)
+        self.set_page_size(view)
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        self.current_page_size = page_size
+        self.page_number = self.get_page_number(request, queryset, page_size)
+        offset = (self.page_number - 1) * page_size
+        objects = list(queryset[offset:offset + page_size + 1])
+        if not objects and self.page_number > 1:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=self.page_number,
+                    message='Страница не содержит результатов.',
+                )
+            )
+        self.has_next = len(objects) > page_size
+        if self.with_count:
+            self.count = self.get_count(queryset, offset, objects, page_size)
+        self.display_page_controls = self.template is not None and (
+            self.has_next or self.page_number > 1
+        )
+        return objects[:page_size]
+
+    def get_last_page_number(self):
+        """
+        Номер последней страницы для ссылок browsable API: по выведенному
+        количеству объектов, а без него - по наличию следующей страницы.
+        """
+        last_page_number = self.page_number + int(self.has_next)
+        if self.with_count:
+            last_page_number = max(
+                last_page_number,
+                math.ceil(self.count / self.current_page_size),
+            )
+        return last_page_number
+
+    def get_html_context(self):
+        base_url = self.request.build_absolute_uri()
+
+        def page_number_to_url(page_number):
+            if page_number == 1:
+                return remove_query_param(base_url, self.page_query_param)
+            return replace_query_param(
+                base_url, self.page_query_param, page_number
+            )
+
+        page_numbers = pagination._get_displayed_page_numbers(
+            self.page_number, self.get_last_page_number()
+        )
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+            'page_links': pagination._get_page_links(
+                page_numbers, self.page_number, page_number_to_url
+            ),
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param,
+            self.page_number + 1,
+        )
+
+    def get_previous_link(self):
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
+
+    def get_paginated_response(self, data):
+        page = [
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]
+        if self.with_count:
+            page.insert(0, ('count', self.count))
+        return Response(OrderedDict(page))
+
+
+class KeysetPagination(PageSizeMixin, pagination.CursorPagination):
+    """
+    Курсорная пагинация без подсчета общего количества объектов.
+    Порядок сортировки задается атрибутом `cursor_ordering` у view.
+    Пустой параметр `cursor` соответствует первой странице.
+
+    Курсор хранит значения всех полей сортировки последнего (или
+    первого) объекта страницы, и страница выбирается условием по
+    составному ключу, например (pub_date, id) > (p, i), без OFFSET,
+    даже если у нескольких объектов совпадает значение первого поля.
+    Последнее поле сортировки должно быть уникальным (id), поля
+    сортировки не должны принимать значение NULL.
+    """
+
+    ordering = ('id',)
+
+    def decode_cursor(self, request):
+        if not request.query_params.get(self.cursor_query_param):
+            return None
+        cursor = super().decode_cursor(request)
+        try:
+            position = json.loads(cursor.position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=position)
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, 'cursor_ordering', self.ordering))
+
+    def get_keyset_filter(self, position, reverse):
+        """
+        Условие "после позиции" по составному ключу: OR по префиксам
+        полей сортировки, например (a > p) | (a = p & b > q).
+        """
+        condition = Q()
+        equal = {}
+        for order, value in zip(self.ordering, position):
+            field_name = order.lstrip('-')
+            lookup = 'lt' if order.startswith('-') != reverse else 'gt'
+            condition |= Q(**equal, **{f'{field_name}__{lookup}': value})
+            equal[field_name] = value
+        return condition
+
+    def get_position(self, instance):
+        values = []
+        for order in self.ordering:
+            field_name = order.lstrip('-')
+            if isinstance(instance, dict):
+                values.append(instance[field_name])
+            else:
+                values.append(getattr(instance, field_name))
+        return json.dumps([str(value) for value in values])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.set_page_size(view)
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        if reverse:
+            queryset = queryset.order_by(
+                *pagination._reverse_ordering(self.ordering)
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(self.cursor.position, reverse)
+            )
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        self.display_page_controls = self.template is not None and (
+            self.has_next or self.has_previous
+        )
+        return self.page
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(
+            pagination.Cursor(0, False, self.get_position(self.page[-1]))
+        )
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self.encode_cursor(
+            pagination.Cursor(0, True, self.get_position(self.page[0]))
+        )
+
+
+class PageNumberOrCursorPagination(pagination.BasePagination):
+    """
+    Постраничная пагинация по номеру страницы, с переключением на
+    курсорную пагинацию при наличии в запросе параметра `cursor`.
+    """
+
+    page_number_class = PageSizePagination
+    cursor_class = KeysetPagination
+
+    def __init__(self):
+        self.page_number_paginator = self.page_number_class()
+        self.cursor_paginator = self.cursor_class()
+        self.paginator = self.page_number_paginator
+
+    @property
+    def display_page_controls(self):
+        return self.paginator.display_page_controls
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_paginator.cursor_query_param in request.query_params:
+            self.paginator = self.cursor_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number_paginator.get_schema_operation_parameters(view)
+            + self.cursor_paginator.get_schema_operation_parameters(view)
+        )
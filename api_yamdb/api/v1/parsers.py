@@ -0,0 +1,56 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    Разбор JSON через orjson, если пакет установлен. orjson принимает
+    только UTF-8, поэтому тела в других кодировках и запросы без orjson
+    разбираются стандартным JSONParser.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class NDJSONParser(FastJSONParser):
+    """
+    Разбор NDJSON: каждая непустая строка тела - отдельный JSON-объект,
+    результат - список объектов.
+    """
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        loads = orjson.loads if orjson is not None else json.loads
+        try:
+            lines = stream.read().decode(encoding).splitlines()
+        except UnicodeDecodeError as exc:
+            raise ParseError('NDJSON parse error - %s' % exc)
+        items = []
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(loads(line))
+            except ValueError as exc:
+                raise ParseError(
+                    'NDJSON parse error - строка %s: %s' % (number, exc)
+                )
+        return items
@@ -24,10 +24,11 @@ class IsOwnerModeratorAdminOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return (
-            request.user.is_authenticated
-            and (obj.author == request.user)
-            or (request.user.is_admin or request.user.is_moderator)
+        # Сравнение по author_id, чтобы не загружать автора из базы.
+        return request.user.is_authenticated and (
+            obj.author_id == request.user.pk
+            or request.user.is_admin
+            or request.user.is_moderator
         )
 
 
@@ -46,4 +47,4 @@ class IsProfileOwner(permissions.BasePermission):
         return request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.user
+        return obj.pk == request.user.pk
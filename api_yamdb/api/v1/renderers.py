@@ -0,0 +1,48 @@
+"""
+Рендерер JSON на основе orjson. orjson - необязательная зависимость: если
+пакет не установлен, используется стандартный JSONRenderer DRF.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Компактный JSON через orjson с тем же результатом, что у JSONRenderer:
+    даты и типы, которые orjson не поддерживает (ленивые строки переводов,
+    Decimal и т.п.), преобразуются кодировщиком DRF, символы U+2028 и
+    U+2029 экранируются. Ответы с отступами, ответы в ASCII и данные,
+    которые orjson не может закодировать (например, целые числа больше
+    64 бит), отдаются стандартному рендереру.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=(
+                    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                ),
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029'
+            )
+        return ret
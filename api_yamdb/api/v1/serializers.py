@@ -1,14 +1,112 @@
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
+from django.utils.text import Truncator
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
+from rest_framework.relations import MANY_RELATION_KWARGS
 from rest_framework_simplejwt.tokens import RefreshToken
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
+from .bulk import set_many_to_many
 from .utils import code_generator
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class SparseFieldsetSerializerMixin:
+    """Оставляет в сериализаторе только поля из контекста `fields`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который при пакетной записи ищет объекты в словаре
+    из контекста `slug_objects` (ключ - модель и поле slug), загруженном
+    одним запросом на весь пакет. Без словаря объект ищется в базе, а при
+    many=True все slug списка загружаются одним запросом.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return PreloadedManyRelatedField(**list_kwargs)
+
+    def get_slug_objects(self):
+        return self.context.get('slug_objects', {}).get(
+            (self.get_queryset().model, self.slug_field)
+        )
+
+    def load_slug_objects(self, values):
+        """Словарь {slug: объект} для values одним запросом slug__in."""
+        slugs = {
+            str(value) for value in values if isinstance(value, (str, int))
+        }
+        if not slugs:
+            return {}
+        return {
+            str(getattr(obj, self.slug_field)): obj
+            for obj in self.get_queryset().filter(
+                **{f'{self.slug_field}__in': slugs}
+            )
+        }
+
+    def to_internal_value(self, data):
+        objects = self.get_slug_objects()
+        if objects is None:
+            return super().to_internal_value(data)
+        return self.lookup_slug(data, objects)
+
+    def lookup_slug(self, data, objects):
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        try:
+            return objects[str(data)]
+        except KeyError:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data),
+            )
+
+
+class PreloadedManyRelatedField(serializers.ManyRelatedField):
+    """
+    Список slug: объекты загружаются одним запросом на весь список,
+    ошибка выводится для каждого некорректного или несуществующего slug.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        objects = self.child_relation.get_slug_objects()
+        if objects is None:
+            objects = self.child_relation.load_slug_objects(data)
+        result = []
+        errors = []
+        for item in data:
+            try:
+                result.append(self.child_relation.lookup_slug(item, objects))
+            except serializers.ValidationError as exc:
+                errors.extend(exc.detail)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return result
+
+
+class ReviewSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     """Сериализатор модели Review."""
 
     title = serializers.SlugRelatedField(
@@ -21,19 +119,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only=True,
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == 'POST':
-            if Review.objects.filter(title=title, author=author).exists():
-                raise ValidationError(
-                    'Вы не можете добавить более'
-                    'одного отзыва на произведение'
-                )
-        return data
-
     class Meta:
         model = Review
         fields = '__all__'
@@ -57,12 +142,15 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitleViewSerializer(serializers.ModelSerializer):
+class TitleViewSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     genre = GenreSerializer(many=True, required=True)
     category = CategorySerializer(
         required=True,
     )
     rating = serializers.IntegerField(read_only=True)
+    review_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -71,6 +159,7 @@ class TitleViewSerializer(serializers.ModelSerializer):
             'name',
             'year',
             'rating',
+            'review_count',
             'description',
             'genre',
             'category',
@@ -80,6 +169,7 @@ class TitleViewSerializer(serializers.ModelSerializer):
             'name',
             'year',
             'rating',
+            'review_count',
             'description',
             'genre',
             'category',
@@ -89,12 +179,12 @@ class TitleViewSerializer(serializers.ModelSerializer):
 class TitleCreateUpdateSerializer(serializers.ModelSerializer):
     """Сериализатор модели Title (кроме метода GET)."""
 
-    genre = serializers.SlugRelatedField(
+    genre = PreloadedSlugRelatedField(
         many=True,
         queryset=Genre.objects.all(),
         slug_field='slug',
     )
-    category = serializers.SlugRelatedField(
+    category = PreloadedSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug',
     )
@@ -103,6 +193,25 @@ class TitleCreateUpdateSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'description', 'year', 'category', 'genre')
         model = Title
 
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        with transaction.atomic():
+            title = super().create(validated_data)
+            set_many_to_many(Title, 'genre', [(title, genres)])
+        return title
+
+    def update(self, instance, validated_data):
+        """
+        Жанры записываются разницей с текущими связями: удаляются только
+        убранные жанры и добавляются только новые.
+        """
+        genres = validated_data.pop('genre', None)
+        with transaction.atomic():
+            title = super().update(instance, validated_data)
+            if genres is not None:
+                set_many_to_many(Title, 'genre', [(title, genres)])
+        return title
+
 
 class ConfirmationCodeSerializer(serializers.ModelSerializer):
     """Сериализатор для отправки пользователю кода подтверждения."""
@@ -143,7 +252,9 @@ class EmailAuthSerializer(serializers.Serializer):
         )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     """Сериализатор для эндпоинта user."""
 
     class Meta:
@@ -158,10 +269,12 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     """Сериализатор модели Comment."""
 
-    review = serializers.SlugRelatedField(slug_field='text', read_only=True)
+    review = serializers.SerializerMethodField()
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True
     )
@@ -169,3 +282,20 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = '__all__'
+
+    def get_review(self, obj):
+        """
+        Отзыв в формате из контекста: id отзыва, начало текста длиной
+        COMMENT_REVIEW_EXCERPT_LENGTH символов или полный текст.
+        """
+        review_format = self.context.get('review_format', 'id')
+        if review_format == 'text':
+            return obj.review.text
+        if review_format == 'excerpt':
+            excerpt = getattr(obj, 'review_excerpt', None)
+            if excerpt is None:
+                excerpt = obj.review.text
+            return Truncator(excerpt).chars(
+                settings.COMMENT_REVIEW_EXCERPT_LENGTH
+            )
+        return obj.review_id
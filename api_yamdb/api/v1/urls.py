@@ -1,4 +1,4 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView
 
@@ -7,8 +7,10 @@ from .views import (
     CategoryViewSet,
     CommentViewSet,
     ConfirmationCodeView,
+    ExportView,
     GenreViewSet,
     ReviewViewSet,
+    SearchView,
     TitleViewSet,
     UserViewSet,
 )
@@ -42,4 +44,10 @@ auth_patterns = [
 urlpatterns = [
     path('', include(router.urls)),
     path('auth/', include(auth_patterns)),
+    path('search/', SearchView.as_view(), name='search'),
+    re_path(
+        r'^export/(?P<resource>\w+)\.(?P<export_format>\w+)$',
+        ExportView.as_view(),
+        name='export',
+    ),
 ]
@@ -1,5 +1,15 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import close_old_connections, connections
+from users.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
 
 
 def code_generator(username):
@@ -7,6 +17,141 @@ def code_generator(username):
     return username.encode("utf-8").hex()[:10]
 
 
+class EmailBatchDispatcher:
+    """
+    Фоновая отправка писем пакетами. Письма, поступившие в течение
+    CONFIRMATION_EMAIL_BATCH_WINDOW секунд после первого письма пакета
+    (но не более CONFIRMATION_EMAIL_BATCH_SIZE), отправляются через одно
+    подключение к почтовому серверу. Письма, которые не удалось отправить,
+    сохраняются в очередь OutgoingEmail.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.metrics = {
+            'batches': 0,
+            'messages': 0,
+            'errors': 0,
+            'outbox': 0,
+            'last_batch_size': 0,
+            'max_batch_size': 0,
+            'last_send_seconds': 0.0,
+            'total_send_seconds': 0.0,
+        }
+
+    def send(self, message):
+        """Добавляет письмо в очередь и запускает фоновый поток."""
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name='email-batch-dispatcher', daemon=True
+                )
+                self.thread.start()
+                atexit.register(self.flush)
+        self.queue.put(message)
+
+    def flush(self):
+        """Ожидает отправки всех писем из очереди."""
+        self.queue.join()
+
+    def collect_batch(self):
+        """Собирает пакет писем, поступивших за время окна."""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + settings.CONFIRMATION_EMAIL_BATCH_WINDOW
+        while len(batch) < settings.CONFIRMATION_EMAIL_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def send_batch(self, batch):
+        """
+        Отправляет пакет писем через одно подключение. При ошибке отправка
+        повторяется не более CONFIRMATION_EMAIL_BATCH_RETRIES раз с
+        растущей задержкой, затем письма сохраняются в очередь
+        OutgoingEmail, которую отправляет команда send_emails.
+        """
+        retries = settings.CONFIRMATION_EMAIL_BATCH_RETRIES
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(
+                    settings.CONFIRMATION_EMAIL_BATCH_RETRY_DELAY * attempt
+                )
+            started = time.monotonic()
+            try:
+                with get_connection(fail_silently=False) as connection:
+                    connection.send_messages(batch)
+            except Exception as exception:
+                logger.exception(
+                    'Ошибка отправки пакета из %s писем', len(batch)
+                )
+                error = exception
+                with self.lock:
+                    self.metrics['errors'] += 1
+                continue
+            self.record_batch(len(batch), time.monotonic() - started)
+            return
+        self.save_to_outbox(batch, error)
+
+    def record_batch(self, size, elapsed):
+        """Обновляет метрики после отправки пакета."""
+        with self.lock:
+            self.metrics['batches'] += 1
+            self.metrics['messages'] += size
+            self.metrics['last_batch_size'] = size
+            self.metrics['max_batch_size'] = max(
+                self.metrics['max_batch_size'], size
+            )
+            self.metrics['last_send_seconds'] = elapsed
+            self.metrics['total_send_seconds'] += elapsed
+        logger.info('Отправлен пакет из %s писем за %.3f с', size, elapsed)
+
+    def save_to_outbox(self, batch, error):
+        """
+        Сохраняет неотправленные письма в очередь OutgoingEmail. Запись
+        выполняется в фоновом потоке, поэтому подключение потока к базе
+        закрывается после нее.
+        """
+        close_old_connections()
+        try:
+            OutgoingEmail.objects.bulk_create(
+                OutgoingEmail(
+                    subject=message.subject,
+                    body=message.body,
+                    from_email=message.from_email,
+                    to=recipient,
+                    error=str(error),
+                )
+                for message in batch
+                for recipient in message.recipients()
+            )
+        finally:
+            connections.close_all()
+        with self.lock:
+            self.metrics['outbox'] += len(batch)
+        logger.warning(
+            'Пакет из %s писем сохранен в очередь отправки', len(batch)
+        )
+
+    def run(self):
+        while True:
+            batch = self.collect_batch()
+            try:
+                self.send_batch(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+
+email_dispatcher = EmailBatchDispatcher()
+
+
 def confirmation_code_email(email, confirmation_code):
     """Шаблон письма для отправки пользователю кода подтверждения."""
 
@@ -16,6 +161,24 @@ def confirmation_code_email(email, confirmation_code):
         f"YaMDB.\n\nВнимание, храните его в тайне.\n"
         f"Ваш код подтверждения: {confirmation_code}"
     )
+    if settings.CONFIRMATION_EMAIL_DELIVERY == 'outbox':
+        OutgoingEmail.objects.create(
+            subject=email_subject,
+            body=email_body,
+            from_email=settings.DEFAULT_EMAIL_SENDER_ADDRESS,
+            to=email,
+        )
+        return
+    if settings.CONFIRMATION_EMAIL_DELIVERY == 'batch':
+        email_dispatcher.send(
+            EmailMessage(
+                email_subject,
+                email_body,
+                settings.DEFAULT_EMAIL_SENDER_ADDRESS,
+                [email],
+            )
+        )
+        return
     send_mail(
         email_subject,
         email_body,
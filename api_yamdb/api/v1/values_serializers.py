@@ -0,0 +1,186 @@
+"""
+Сериализация списков только для чтения без механизма полей DRF.
+
+Строки страницы загружаются через values(), а словари ответа строятся
+напрямую в порядке полей исходного сериализатора, поэтому JSON ответа
+совпадает с ответом сериализатора DRF побайтно. Для каждого поля
+сериализатора задаются колонки values() и функция, которая получает
+значение поля из строки.
+"""
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils.text import Truncator
+from rest_framework import serializers
+from rest_framework.response import Response
+from reviews.models import Genre
+
+from .serializers import CommentSerializer, ReviewSerializer
+from .serializers import TitleViewSerializer
+
+datetime_field = serializers.DateTimeField()
+
+
+def represent_datetime(column):
+    def getter(row):
+        value = row[column]
+        return None if value is None else datetime_field.to_representation(
+            value
+        )
+
+    return getter
+
+
+class ValuesSerializer:
+    """
+    Базовый класс: serializer_class - сериализатор DRF, ответ которого
+    воспроизводится, columns - колонки values() для полей, имена которых не
+    совпадают с колонками модели.
+    """
+
+    serializer_class = None
+    columns = {}
+
+    def __init__(self, context):
+        self.context = context
+        selected = context.get('fields')
+        self.fields = [
+            name
+            for name in self.serializer_class(context=context).fields
+            if selected is None or name in selected
+        ]
+        self.getters = [
+            (name, self.get_getter(name)) for name in self.fields
+        ]
+
+    def get_columns(self, field):
+        return self.columns.get(field, (field,))
+
+    def get_getter(self, field):
+        getter = getattr(self, f'get_{field}', None)
+        if getter is not None:
+            return getter
+        return itemgetter(self.get_columns(field)[0])
+
+    def get_rows(self, queryset, extra_columns=()):
+        """
+        values()-запрос с колонками выбранных полей. extra_columns
+        добавляет колонки, которые нужны пагинации (например, поля
+        сортировки курсора).
+        """
+        columns = {queryset.model._meta.pk.name, *extra_columns}
+        for field in self.fields:
+            columns.update(self.get_columns(field))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def to_representation(self, rows):
+        getters = self.getters
+        return [
+            {name: getter(row) for name, getter in getters} for row in rows
+        ]
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    """
+    Произведения страницы. Жанры всех произведений загружаются одним
+    запросом, как при prefetch_related('genre').
+    """
+
+    serializer_class = TitleViewSerializer
+    columns = {
+        'rating': ('rating_sum', 'rating_count'),
+        'review_count': ('rating_count',),
+        'genre': (),
+        'category': ('category__name', 'category__slug'),
+    }
+
+    def get_rating(self, row):
+        if not row['rating_count']:
+            return None
+        return row['rating_sum'] // row['rating_count']
+
+    def get_genre(self, row):
+        return self.genres.get(row['id'], [])
+
+    def get_category(self, row):
+        if row['category__slug'] is None:
+            return None
+        return {'name': row['category__name'], 'slug': row['category__slug']}
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        self.genres = {}
+        if 'genre' in self.fields and rows:
+            genres = Genre.objects.filter(
+                title__in=[row['id'] for row in rows]
+            ).values_list('title', 'name', 'slug')
+            for title_id, name, slug in genres:
+                self.genres.setdefault(title_id, []).append(
+                    {'name': name, 'slug': slug}
+                )
+        return super().to_representation(rows)
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    serializer_class = ReviewSerializer
+    columns = {
+        'title': ('title__name',),
+        'author': ('author__username',),
+    }
+    get_pub_date = staticmethod(represent_datetime('pub_date'))
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """Комментарии с отзывом в формате из контекста review_format."""
+
+    serializer_class = CommentSerializer
+    columns = {'author': ('author__username',)}
+    get_pub_date = staticmethod(represent_datetime('pub_date'))
+
+    def get_columns(self, field):
+        if field == 'review':
+            return {
+                'id': ('review',),
+                'excerpt': ('review_excerpt',),
+                'text': ('review__text',),
+            }[self.context.get('review_format', 'id')]
+        return super().get_columns(field)
+
+    def get_review(self, row):
+        review_format = self.context.get('review_format', 'id')
+        if review_format == 'excerpt':
+            return Truncator(row['review_excerpt']).chars(
+                settings.COMMENT_REVIEW_EXCERPT_LENGTH
+            )
+        return row[self.get_columns('review')[0]]
+
+
+class ValuesListMixin:
+    """
+    Ответ на GET-запрос списка строится сериализатором values_serializer_class
+    из строк values(), если включена настройка API_VALUES_SERIALIZATION.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not (
+            settings.API_VALUES_SERIALIZATION and self.values_serializer_class
+        ):
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class(
+            self.get_serializer_context()
+        )
+        rows = serializer.get_rows(
+            self.filter_queryset(self.get_queryset()),
+            extra_columns=[
+                column.lstrip('-')
+                for column in getattr(self, 'cursor_ordering', ())
+            ],
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page)
+            )
+        return Response(serializer.to_representation(rows))
@@ -1,16 +1,27 @@
-from django.db.models import Avg
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models.functions import Substr
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from reviews.models import Category, Genre, Review, Title
+from reviews.search import get_search_backend
 from users.models import User
 
+from .bulk import BulkMixin
+from .cache import CachedResponseMixin, ConditionalGetMixin
+from .counts import CachedCount, EstimatedCount, StoredCount
+from .export import EXPORTS, STREAMS
+from .fieldsets import SparseFieldsetMixin
 from .filters import TitleFilter
+from .pagination import PageNumberOrCursorPagination, PageSizePagination
 from .permissions import (
     IsAdminOnly,
     IsAdminOrReadOnly,
@@ -28,24 +39,54 @@ from .serializers import (
     UserSerializer,
 )
 from .utils import code_generator, confirmation_code_email
+from .values_serializers import (
+    CommentValuesSerializer,
+    ReviewValuesSerializer,
+    TitleValuesSerializer,
+    ValuesListMixin,
+)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    BulkMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     """
     Эндпоинт для работы с моделью Title.
     Разрешено частичное обновление, добавление, удаление,
     получение списка всех элементов и одного элемента.
     Доступен всем для чтения и администратору для модификации.
     Подключена фильтрация по полям: category, genre, name, year.
+    Поддерживается курсорная пагинация через параметр cursor.
+    Поля ответа выбираются параметрами fields и omit.
+    Ответы анонимным пользователям кэшируются.
+    Пакетная запись - через эндпоинт bulk/ (см. bulk.py).
     """
 
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.all()
     serializer_class = TitleCreateUpdateSerializer
+    values_serializer_class = TitleValuesSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('id',)
+    count_strategy = EstimatedCount(fallback=CachedCount())
+    cache_namespace = 'titles'
+    cache_anonymous_only = True
+    condition_namespaces = ('titles',)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     http_method_names = ['patch', 'get', 'post', 'delete']
+    sparse_columns = {
+        'rating': ('rating_sum', 'rating_count'),
+        'review_count': ('rating_count',),
+        'genre': (),
+        'category': ('category__name', 'category__slug'),
+    }
+    sparse_prefetch = {'genre': 'genre'}
 
     def get_serializer_class(self):
         """Определяет какой сериализатор будет использоваться
@@ -54,6 +95,33 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleViewSerializer
         return TitleCreateUpdateSerializer
 
+    def get_queryset(self):
+        """
+        Для чтения категория подгружается через JOIN, а жанры одним
+        дополнительным запросом на всю страницу, чтобы количество запросов
+        не зависело от размера страницы.
+        """
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            queryset = queryset.select_related('category').prefetch_related(
+                'genre'
+            )
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_bulk_result_queryset(self):
+        return Title.objects.select_related('category').prefetch_related(
+            'genre'
+        )
+
+    def bulk_saved(self, instances):
+        super().bulk_saved(instances)
+        get_search_backend().index_titles(instances)
+
 
 class ListCreateDestroyViewSet(
     mixins.ListModelMixin,
@@ -64,36 +132,62 @@ class ListCreateDestroyViewSet(
     pass
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    BulkMixin,
+    ListCreateDestroyViewSet,
+):
     """
     Эндпоинт для работы с моделью Category.
     Разрешено добавление, удаление и получение списка всех элементов.
     Доступен всем для чтения и администратору для модификации.
     Подключена фильтрация по полю: name
+    Ответы на запросы списка кэшируются.
+    Пакетная запись - через эндпоинт bulk/ (см. bulk.py).
     """
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
+    bulk_lookup_field = 'slug'
+    bulk_lookup_name = 'slug'
+    cache_namespace = 'categories'
+    condition_namespaces = ('categories',)
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = PageSizePagination
+    page_size = 50
+    count_strategy = CachedCount()
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    BulkMixin,
+    ListCreateDestroyViewSet,
+):
     """
     Эндпоинт для работы с моделью Genre.
     Разрешено добавление, удаление и получение списка всех элементов.
     Доступен всем для чтения и администратору для модификации.
     Подключена фильтрация по полю: name
+    Ответы на запросы списка кэшируются.
+    Пакетная запись - через эндпоинт bulk/ (см. bulk.py).
     """
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     lookup_field = 'slug'
+    bulk_lookup_field = 'slug'
+    bulk_lookup_name = 'slug'
+    cache_namespace = 'genres'
+    condition_namespaces = ('genres',)
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = PageSizePagination
+    page_size = 50
+    count_strategy = CachedCount()
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
 
@@ -129,12 +223,53 @@ class ConfirmationCodeView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class SearchView(APIView):
+    """
+    Полнотекстовый поиск по названиям и описаниям произведений и текстам
+    отзывов. Строка поиска передается в параметре q, результаты
+    упорядочены по релевантности и разбиты на страницы.
+    """
+
+    permission_classes = (permissions.AllowAny,)
+    pagination_class = PageSizePagination
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        results = get_search_backend().search(query)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(results, request, view=self)
+        return paginator.get_paginated_response(page)
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка ресурса каталога в CSV или NDJSON, например
+    /export/titles.csv. Столбцы совпадают с файлами команды
+    load_data_from_csv. Доступна только администратору.
+    """
+
+    permission_classes = (IsAdminOnly,)
+
+    def get(self, request, resource, export_format):
+        if resource not in EXPORTS or export_format not in STREAMS:
+            raise NotFound('Ресурс для выгрузки не найден.')
+        content_type, stream = STREAMS[export_format]
+        response = StreamingHttpResponse(
+            stream(EXPORTS[resource]), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{export_format}"'
+        )
+        return response
+
+
+class UserViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     Эндпоинт для управления пользователями.
     Можно осуществлять добавление и поиск по пользователям.
     Пользователь может дополнить данные о себе через обращение к эндпоинту
     /me/.
+    Поля ответа выбираются параметрами fields и omit.
     """
 
     queryset = User.objects.all()
@@ -162,45 +297,193 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    """ViewSet для отправки отзывов."""
+class ParentObjectMixin:
+    """
+    Родительский объект вложенного маршрута (произведение для отзывов,
+    отзыв для комментариев) загружается один раз за запрос и используется
+    во view, сериализаторе и проверках прав через get_parent().
+    parent_lookups задает соответствие полей модели параметрам URL.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+
+    def initial(self, request, *args, **kwargs):
+        """
+        Родительский объект загружается до проверок условного GET: для
+        несуществующего родителя возвращается 404, а не 304.
+        """
+        super().initial(request, *args, **kwargs)
+        self.get_parent()
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model,
+                **{
+                    field: self.kwargs.get(kwarg)
+                    for field, kwarg in self.parent_lookups.items()
+                },
+            )
+        return self._parent
+
+
+class ReviewViewSet(
+    ConditionalGetMixin,
+    ParentObjectMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    ViewSet для отправки отзывов.
+    Поля ответа выбираются параметрами fields и omit.
+    """
 
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     permission_classes = [
         IsOwnerModeratorAdminOrReadOnly,
         IsAuthenticatedOrReadOnly,
     ]
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('pub_date', 'id')
+    condition_namespaces = ('reviews:{title_id}',)
+    count_strategy = StoredCount(fallback=CachedCount())
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
+    sparse_columns = {
+        'author': ('author__username',),
+        'title': ('title__name',),
+    }
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
+        """
+        Автор и произведение загружаются в том же запросе, что и отзывы,
+        и только с полями, которые выводит сериализатор.
+        """
+        return (
+            self.get_parent()
+            .reviews.select_related('author', 'title')
+            .only(
+                'id',
+                'text',
+                'score',
+                'pub_date',
+                'comment_count',
+                'author__username',
+                'title__name',
+            )
+        )
 
-        return title.reviews.all()
+    def get_stored_count(self, queryset):
+        """
+        Список отзывов не фильтруется, поэтому количество отзывов берется
+        из количества оценок произведения без COUNT(*).
+        """
+        return self.get_parent().rating_count
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        """
+        Повторный отзыв автора на произведение отклоняется ограничением
+        unique_review в базе, ошибка преобразуется в ответ 400.
+        """
+        try:
+            serializer.save(author=self.request.user, title=self.get_parent())
+        except IntegrityError:
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Вы не можете добавить более '
+                        'одного отзыва на произведение'
+                    ]
+                }
+            )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
-    """ViewSet для отправки комментария."""
+class CommentViewSet(
+    ConditionalGetMixin,
+    ParentObjectMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    ViewSet для отправки комментария.
+    Поля ответа выбираются параметрами fields и omit.
+    """
 
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     permission_classes = [
         IsOwnerModeratorAdminOrReadOnly,
         IsAuthenticatedOrReadOnly,
     ]
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('pub_date', 'id')
+    condition_namespaces = ('comments:{review_id}',)
+    page_size = 5
+    count_strategy = StoredCount(fallback=CachedCount())
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
+    review_formats = ('id', 'excerpt', 'text')
+    sparse_columns = {'author': ('author__username',)}
+
+    def get_review_format(self):
+        """Формат отзыва в ответе из параметра запроса review."""
+        review_format = self.request.query_params.get(
+            'review', settings.COMMENT_REVIEW_FORMAT
+        )
+        if review_format not in self.review_formats:
+            raise ValidationError(
+                {
+                    'review': [
+                        'Допустимые значения: '
+                        + ', '.join(self.review_formats)
+                    ]
+                }
+            )
+        return review_format
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['review_format'] = self.get_review_format()
+        return context
+
+    def get_stored_count(self, queryset):
+        """Количество комментариев хранится в отзыве."""
+        return self.get_parent().comment_count
+
+    def get_sparse_columns(self, field):
+        if field == 'review' and self.get_review_format() == 'text':
+            return ('review__text',)
+        return super().get_sparse_columns(field)
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get("review_id"),
-            title__id=self.kwargs.get("title_id"),
+        """
+        Автор загружается в том же запросе, что и комментарии, и только
+        с полями, которые выводит сериализатор. Текст отзыва читается из
+        базы только для форматов 'excerpt' (начало текста) и 'text'.
+        """
+        queryset = (
+            self.get_parent()
+            .comments.select_related('author')
+            .only('id', 'text', 'pub_date', 'review', 'author__username')
         )
-        return review.comments.all()
+        review_format = self.get_review_format()
+        if review_format == 'text':
+            return queryset.select_related('review').only(
+                'id', 'text', 'pub_date', 'author__username', 'review__text'
+            )
+        if review_format == 'excerpt':
+            return queryset.annotate(
+                review_excerpt=Substr(
+                    'review__text',
+                    1,
+                    settings.COMMENT_REVIEW_EXCERPT_LENGTH + 1,
+                )
+            )
+        return queryset
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
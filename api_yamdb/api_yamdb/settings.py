@@ -123,10 +123,57 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.v1.pagination.PageSizePagination',
     'PAGE_SIZE': 10,
+    # JSON через orjson, если он установлен (pip install orjson).
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.v1.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.v1.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
 }
 
+# Максимальный размер страницы, который можно запросить параметром
+# page_size.
+API_MAX_PAGE_SIZE = 1000
+
+# Размер таблицы, начиная с которого для списков без фильтров выводится
+# оценка количества объектов по статистике СУБД вместо COUNT(*).
+API_ESTIMATED_COUNT_THRESHOLD = 100000
+
+# Максимальное количество элементов в запросе к эндпоинтам bulk/.
+API_BULK_MAX_ITEMS = 1000
+
+# Количество строк, читаемых из базы за раз при выгрузке каталога.
+API_EXPORT_CHUNK_SIZE = 2000
+
+# Время хранения кэшированных ответов API в секундах.
+API_CACHE_TIMEOUT = 300
+
+# Ответы на запросы списков произведений, отзывов и комментариев строятся
+# из строк values() без сериализаторов DRF (api/v1/values_serializers.py).
+API_VALUES_SERIALIZATION = True
+
+# Формат отзыва в ответах с комментариями по умолчанию: 'id', 'excerpt'
+# или 'text'. Клиент может выбрать формат параметром запроса review.
+COMMENT_REVIEW_FORMAT = 'id'
+
+# Длина начала текста отзыва в формате 'excerpt'.
+COMMENT_REVIEW_EXCERPT_LENGTH = 100
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = str(BASE_DIR.joinpath('sent_emails'))
@@ -147,3 +194,20 @@ PATH_CSV_FILES = {
 }
 
 DEFAULT_EMAIL_SENDER_ADDRESS = 'no-reply@yamdb.com'
+
+# Способ отправки кода подтверждения: 'sync' - в обработчике запроса,
+# 'outbox' - через очередь писем, которую отправляет команда send_emails,
+# 'batch' - пакетами в фоновом потоке процесса.
+CONFIRMATION_EMAIL_DELIVERY = os.getenv('CONFIRMATION_EMAIL_DELIVERY', 'sync')
+
+# Окно накопления пакета (в секундах) и размер пакета для режима 'batch'.
+CONFIRMATION_EMAIL_BATCH_WINDOW = 0.5
+
+CONFIRMATION_EMAIL_BATCH_SIZE = 100
+
+# Число повторных попыток отправки пакета и задержка перед первой из них
+# (в секундах) для режима 'batch'. Пакет, который не удалось отправить,
+# сохраняется в очередь для команды send_emails.
+CONFIRMATION_EMAIL_BATCH_RETRIES = 3
+
+CONFIRMATION_EMAIL_BATCH_RETRY_DELAY = 1
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from . import signals
+
+        post_migrate.connect(signals.rebuild_search_index, sender=self)
+        post_migrate.connect(signals.restore_title_index, sender=self)
@@ -0,0 +1,117 @@
+"""
+Индексы для поиска подстроки в названии произведения.
+
+В SQLite используется внешняя FTS5-таблица с триграммным токенизатором,
+которая поддерживается триггерами на таблице reviews_title. Токенизатор
+различает регистр, как и фильтр contains. SQLite
+пересоздает таблицу при изменении ее схемы и удаляет ее триггеры, поэтому
+после миграций индекс создается заново (restore_title_name_index), а без
+триггеров фильтр не использует индекс.
+В PostgreSQL используется GIN-индекс pg_trgm, с которым LIKE '%...%'
+выполняется по индексу.
+"""
+from django.db import OperationalError
+
+TITLE_NAME_FTS_TABLE = 'reviews_title_fts'
+TITLE_NAME_FTS_TRIGGERS = (
+    'reviews_title_fts_ai',
+    'reviews_title_fts_ad',
+    'reviews_title_fts_au',
+)
+TRIGRAM_LENGTH = 3
+
+SQLITE_CREATE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_NAME_FTS_TABLE} USING fts5("
+    "name, content='reviews_title', content_rowid='id', "
+    "tokenize='trigram case_sensitive 1')",
+    "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ai "
+    "AFTER INSERT ON reviews_title BEGIN "
+    f"INSERT INTO {TITLE_NAME_FTS_TABLE}(rowid, name) "
+    "VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ad "
+    "AFTER DELETE ON reviews_title BEGIN "
+    f"INSERT INTO {TITLE_NAME_FTS_TABLE}({TITLE_NAME_FTS_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_au "
+    "AFTER UPDATE OF name ON reviews_title BEGIN "
+    f"INSERT INTO {TITLE_NAME_FTS_TABLE}({TITLE_NAME_FTS_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    f"INSERT INTO {TITLE_NAME_FTS_TABLE}(rowid, name) "
+    "VALUES (new.id, new.name); END",
+    f"INSERT INTO {TITLE_NAME_FTS_TABLE}({TITLE_NAME_FTS_TABLE}) "
+    "VALUES ('rebuild')",
+)
+SQLITE_DROP = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ai',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ad',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_au',
+    f'DROP TABLE IF EXISTS {TITLE_NAME_FTS_TABLE}',
+)
+POSTGRESQL_CREATE = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS reviews_title_name_trgm '
+    'ON reviews_title USING gin (name gin_trgm_ops)',
+)
+POSTGRESQL_DROP = ('DROP INDEX IF EXISTS reviews_title_name_trgm',)
+
+
+def execute_all(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_title_name_index(connection):
+    """Создание индекса по названию произведения для текущей СУБД."""
+    if connection.vendor == 'sqlite':
+        try:
+            execute_all(connection, SQLITE_CREATE)
+        except OperationalError:
+            # Сборка SQLite без FTS5 или без триграммного токенизатора:
+            # фильтрация по названию выполняется без индекса.
+            execute_all(connection, SQLITE_DROP)
+    elif connection.vendor == 'postgresql':
+        execute_all(connection, POSTGRESQL_CREATE)
+
+
+def drop_title_name_index(connection):
+    if connection.vendor == 'sqlite':
+        execute_all(connection, SQLITE_DROP)
+    elif connection.vendor == 'postgresql':
+        execute_all(connection, POSTGRESQL_DROP)
+
+
+def title_name_fts_available(connection):
+    """
+    Проверка наличия FTS5-таблицы для поиска по названию и всех триггеров,
+    которые поддерживают ее в актуальном состоянии.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    names = (TITLE_NAME_FTS_TABLE, *TITLE_NAME_FTS_TRIGGERS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT COUNT(*) FROM sqlite_master WHERE name IN ({})'.format(
+                ', '.join(['%s'] * len(names))
+            ),
+            names,
+        )
+        return cursor.fetchone()[0] == len(names)
+
+
+def restore_title_name_index(connection):
+    """
+    Повторное создание индекса по названию, если он был установлен:
+    восстанавливает триггеры, удаленные при пересоздании reviews_title,
+    и заново заполняет FTS5-таблицу.
+    """
+    if (
+        connection.vendor == 'sqlite'
+        and TITLE_NAME_FTS_TABLE in connection.introspection.table_names()
+    ):
+        create_title_name_index(connection)
+
+
+def fts_phrase(value):
+    """Экранирование строки поиска как фразы FTS5."""
+    return '"{}"'.format(value.replace('"', '""'))
@@ -1,18 +1,28 @@
 import csv
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 
+from api.v1.cache import update_all_content_versions
 from django.conf import settings
-from django.core.management import BaseCommand
-from django.db import IntegrityError
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from django.core.cache import cache
+from django.core.management import BaseCommand, CommandError
+from django.db import IntegrityError, connection, connections, transaction
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    ImportCheckpoint,
+    Review,
+    Title,
+)
+from reviews.search import get_search_backend
 from users.models import User
 
-FIELDS = {
-    'category': Category,
-    'title': Title,
-    'genre': Genre,
-    'author': User,
-    'review': Review,
-}
+from .recalculate_comment_counts import recalculate_comment_counts
+from .recalculate_ratings import recalculate_ratings
+
 CLASSES = [
     Category,
     Genre,
@@ -22,54 +32,390 @@ CLASSES = [
     Review,
     Comment,
 ]
+BATCH_SIZE = 1000
+WORKERS = 4
+
+
+def get_foreign_keys(model_class):
+    """
+    Функция для получения внешних ключей модели по названиям столбцов CSV.
+    Столбец может называться как поле (author) или как столбец БД (author_id).
+    """
+    foreign_keys = {}
+    for field in model_class._meta.concrete_fields:
+        if field.is_relation:
+            foreign_keys[field.name] = field
+            foreign_keys[field.attname] = field
+    return foreign_keys
+
+
+class KnownIds(dict):
+    """
+    Кэш множеств id связанных моделей: каждая модель запрашивается из базы
+    один раз за загрузку, а не по запросу на каждую ячейку.
+    """
 
+    def __missing__(self, model_class):
+        ids = {
+            str(pk) for pk in model_class.objects.values_list('pk', flat=True)
+        }
+        self[model_class] = ids
+        return ids
 
-def change_foreign_values(row_data):
-    """Функция для замены значений id на связанные объекты в строке данных."""
-    row_data_copy = row_data.copy()
 
-    for field_key, field_value in zip(row_data.keys(), row_data.values()):
-        if field_key in FIELDS.keys():
-            row_data_copy[field_key] = FIELDS[field_key].objects.get(
-                pk=field_value
+def change_foreign_values(row_data, foreign_keys, known_ids):
+    """
+    Функция для замены значений внешних ключей в строке данных на значения
+    для полей *_id с проверкой существования связанных объектов.
+    """
+    row_data_copy = {}
+
+    for field_key, field_value in row_data.items():
+        field = foreign_keys.get(field_key)
+        if field is None:
+            row_data_copy[field_key] = field_value
+            continue
+        if field_value and field_value not in known_ids[field.related_model]:
+            raise ValueError(
+                f'{field.related_model.__qualname__} с id={field_value} '
+                f'не найден'
             )
+        row_data_copy[field.attname] = field_value or None
     return row_data_copy
 
 
-def load_data():
+def read_chunks(rows, chunk_size):
+    """Генератор для чтения строк пакетами по chunk_size строк."""
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_rows(reader, offset, failed, finished=False):
     """
-    Функция для загрузки данных из CSV, формирования пакета объектов
-    для загрузки в базу и загрузки данных в базу.
+    Генератор пронумерованных строк CSV, начиная с первой. Из первых
+    offset строк возвращаются только строки с номерами из failed, которые
+    не загрузились ранее. Если загрузка файла завершена, чтение
+    останавливается на последней такой строке.
     """
-    for model_class in CLASSES:
-        with open(
-            settings.PATH_CSV_FILES[model_class.__qualname__.lower()],
-            encoding='utf-8',
-        ) as file:
-            try:
-                dr = csv.DictReader(
-                    file,
-                    delimiter=",",
+    stop = max(failed, default=0) if finished else None
+    for number, row in enumerate(islice(reader, stop), 1):
+        if number > offset or number in failed:
+            yield number, row
+
+
+def get_ranges(numbers):
+    """
+    Функция для сворачивания номеров строк в диапазоны вида
+    [первая строка, последняя строка].
+    """
+    ranges = []
+    for number in sorted(numbers):
+        if ranges and ranges[-1][1] == number - 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+    return ranges
+
+
+def get_numbers(ranges):
+    """Функция для разворачивания диапазонов строк в множество номеров."""
+    return {
+        number for first, last in ranges for number in range(first, last + 1)
+    }
+
+
+def get_checkpoint(model_class, file_path, resume):
+    """
+    Функция для получения контрольной точки загрузки модели. Без resume,
+    а также при смене файла, загрузка начинается с первой строки.
+    """
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+        model=model_class._meta.label
+    )
+    if not resume or checkpoint.file != file_path:
+        checkpoint.file = file_path
+        checkpoint.offset = 0
+        checkpoint.finished = False
+        checkpoint.failed_rows = []
+        checkpoint.save()
+    return checkpoint
+
+
+def build_instances(model_class, chunk, foreign_keys, known_ids):
+    """
+    Функция для создания объектов модели из пронумерованных строк пакета.
+    Строки со ссылками на несуществующие объекты пропускаются. Возвращает
+    пары (номер строки, объект) и ошибки (номер строки, текст ошибки).
+    """
+    instances = []
+    errors = []
+    for number, row in chunk:
+        try:
+            instances.append(
+                (
+                    number,
+                    model_class(
+                        **change_foreign_values(row, foreign_keys, known_ids)
+                    ),
                 )
-                to_db = []
+            )
+        except ValueError as error:
+            errors.append((number, str(error)))
+    return instances, errors
 
-                for row in dr:
-                    row = change_foreign_values(row)
-                    to_db.append(model_class(**row))
 
-                model_class.objects.bulk_create(to_db)
+def save_instances(model_class, instances):
+    """
+    Функция для сохранения объектов пакета одним запросом. Если пакет не
+    сохраняется, объекты сохраняются по одному, чтобы пропустить только
+    ошибочные строки. Возвращает ошибки (номер строки, текст ошибки).
+    """
+    try:
+        with transaction.atomic():
+            model_class.objects.bulk_create(
+                instance for _, instance in instances
+            )
+        return []
+    except (ValueError, IntegrityError):
+        pass
+    errors = []
+    for number, instance in instances:
+        try:
+            with transaction.atomic():
+                model_class.objects.bulk_create([instance])
+        except (ValueError, IntegrityError) as error:
+            errors.append((number, str(error)))
+    return errors
+
 
-            except (ValueError, IntegrityError) as error:
-                print(
-                    f'Ошибка в загружаемых данных. {error}. '
-                    f'Данные в {model_class.__qualname__} не загружены.'
+def load_chunk(model_class, chunk, checkpoint, failed, foreign_keys,
+               known_ids):
+    """
+    Функция для загрузки пакета строк в одной транзакции с контрольной
+    точкой: номера ошибочных строк пакета сохраняются в ней для повторной
+    загрузки. Возвращает количество загруженных строк и ошибки пакета.
+    """
+    instances, errors = build_instances(
+        model_class, chunk, foreign_keys, known_ids
+    )
+    with transaction.atomic():
+        errors += save_instances(model_class, instances)
+        failed.difference_update(number for number, _ in chunk)
+        failed.update(number for number, _ in errors)
+        checkpoint.offset = max(checkpoint.offset, chunk[-1][0])
+        checkpoint.failed_rows = get_ranges(failed)
+        checkpoint.save()
+    return len(chunk) - len(errors), sorted(errors)
+
+
+def load_model(
+    model_class, file_path, known_ids, batch_size=BATCH_SIZE, resume=False
+):
+    """
+    Функция для потоковой загрузки данных модели из CSV. Каждый пакет из
+    batch_size строк сохраняется в отдельной транзакции вместе с контрольной
+    точкой. Ошибочные строки пропускаются, попадают в отчет об ошибках и
+    в контрольную точку; с resume они загружаются повторно. Возвращает
+    количество загруженных строк и список ошибок в виде кортежей
+    (номер строки, текст ошибки).
+    """
+    checkpoint = get_checkpoint(model_class, file_path, resume)
+    failed = get_numbers(checkpoint.failed_rows)
+    if checkpoint.finished and not failed:
+        return 0, []
+    foreign_keys = get_foreign_keys(model_class)
+    loaded = 0
+    errors = []
+
+    with open(file_path, encoding='utf-8') as file:
+        rows = read_rows(
+            csv.DictReader(file, delimiter=","),
+            checkpoint.offset,
+            frozenset(failed),
+            checkpoint.finished,
+        )
+        for chunk in read_chunks(rows, batch_size):
+            chunk_loaded, chunk_errors = load_chunk(
+                model_class, chunk, checkpoint, failed, foreign_keys,
+                known_ids,
+            )
+            loaded += chunk_loaded
+            errors += chunk_errors
+    checkpoint.finished = True
+    checkpoint.save()
+    known_ids.pop(model_class, None)
+    return loaded, errors
+
+
+def get_dependencies(classes):
+    """
+    Функция для построения графа зависимостей моделей по внешним ключам:
+    для каждой модели возвращается множество загружаемых до нее моделей.
+    """
+    return {
+        model_class: {
+            field.related_model
+            for field in model_class._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in classes
+            and field.related_model is not model_class
+        }
+        for model_class in classes
+    }
+
+
+def get_workers(workers):
+    """
+    Функция для определения числа параллельных загрузок. SQLite не
+    поддерживает параллельную запись, поэтому для нее загрузка
+    выполняется последовательно.
+    """
+    if connection.vendor == 'sqlite':
+        return 1
+    return max(workers, 1)
+
+
+def load_model_timed(model_class, known_ids, batch_size, resume):
+    """
+    Функция для загрузки модели с замером времени. Возвращает количество
+    загруженных строк, ошибки и время загрузки в секундах.
+    """
+    started = time.monotonic()
+    loaded, errors = load_model(
+        model_class,
+        settings.PATH_CSV_FILES[model_class.__qualname__.lower()],
+        known_ids,
+        batch_size,
+        resume,
+    )
+    return loaded, errors, time.monotonic() - started
+
+
+def load_model_in_thread(*args):
+    """
+    Функция для загрузки модели в отдельном потоке. Django открывает
+    для каждого потока собственное подключение к базе, которое
+    закрывается после загрузки.
+    """
+    try:
+        return load_model_timed(*args)
+    finally:
+        connections.close_all()
+
+
+def print_report(model_class, loaded, errors, elapsed):
+    """Функция для вывода отчета о загрузке модели."""
+    name = model_class.__qualname__
+    for number, error in errors:
+        print(
+            f'Ошибка в загружаемых данных. {error}. '
+            f'Строка {number} в {name} не загружена.'
+        )
+    rate = loaded / elapsed if elapsed else loaded
+    print(
+        f'Данные в {name} загружены, строк: {loaded} '
+        f'({rate:.0f} строк/с).'
+    )
+
+
+def get_ready_classes(pending, dependencies, loaded_classes):
+    """Функция для выбора моделей, все зависимости которых загружены."""
+    return [
+        model_class
+        for model_class in pending
+        if dependencies[model_class] <= loaded_classes
+    ]
+
+
+def get_loaded_namespaces():
+    """
+    Генератор групп ответов API, которые могут измениться при загрузке:
+    списки каталога, отзывы каждого произведения и комментарии каждого
+    отзыва.
+    """
+    yield from ('titles', 'categories', 'genres')
+    for title_id in Title.objects.values_list('pk', flat=True).iterator():
+        yield f'reviews:{title_id}'
+    for review_id in Review.objects.values_list('pk', flat=True).iterator():
+        yield f'comments:{review_id}'
+
+
+def load_data(batch_size=BATCH_SIZE, resume=False, workers=WORKERS):
+    """
+    Функция для загрузки данных из CSV с учетом зависимостей между
+    моделями: модель загружается после всех моделей, на которые она
+    ссылается, а независимые модели загружаются параллельно.
+    """
+    known_ids = KnownIds()
+    dependencies = get_dependencies(CLASSES)
+    pending = list(CLASSES)
+    loaded_classes = set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=get_workers(workers)) as executor:
+        while pending or running:
+            for model_class in get_ready_classes(
+                pending, dependencies, loaded_classes
+            ):
+                pending.remove(model_class)
+                future = executor.submit(
+                    load_model_in_thread,
+                    model_class,
+                    known_ids,
+                    batch_size,
+                    resume,
                 )
-                break
-        print(f'Данные в {model_class.__qualname__} загружены.')
+                running[future] = model_class
+            if not running:
+                raise CommandError('Циклическая зависимость между моделями.')
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                model_class = running.pop(future)
+                print_report(model_class, *future.result())
+                loaded_classes.add(model_class)
+    recalculate_ratings()
+    print('Рейтинги произведений пересчитаны.')
+    recalculate_comment_counts()
+    print('Количество комментариев отзывов пересчитано.')
+    # bulk_create не отправляет сигналы, поэтому поисковый индекс
+    # перестраивается, а версии и кэш ответов API сбрасываются целиком.
+    get_search_backend().rebuild()
+    print('Поисковый индекс перестроен.')
+    update_all_content_versions(get_loaded_namespaces())
+    cache.clear()
 
 
 class Command(BaseCommand):
     """Класс для создания новой команды на добавление данных из csv файлов."""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк в одном пакете загрузки.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить прерванную загрузку с контрольных точек.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=WORKERS,
+            help=(
+                'Количество моделей, загружаемых параллельно '
+                '(для SQLite всегда 1).'
+            ),
+        )
+
     def handle(self, *args, **options):
-        load_data()
+        load_data(
+            batch_size=options['batch_size'],
+            resume=options['resume'],
+            workers=options['workers'],
+        )
@@ -0,0 +1,70 @@
+from api.v1.cache import invalidate_for_instances
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from reviews.models import Comment, Review
+
+
+def recalculate_comment_counts(fix=True):
+    """
+    Функция для пересчета сохраненного количества комментариев отзывов.
+    Возвращает список расхождений в виде кортежей
+    (id отзыва, сохраненное количество, фактическое количество).
+    """
+    actual = {
+        row['review_id']: row['comment_count']
+        for row in Comment.objects.order_by()
+        .values('review_id')
+        .annotate(comment_count=Count('id'))
+    }
+    drift = []
+    fixed = []
+    with transaction.atomic():
+        for review in Review.objects.only(
+            'id', 'title_id', 'comment_count'
+        ).select_for_update():
+            expected = actual.get(review.id, 0)
+            if review.comment_count == expected:
+                continue
+            drift.append((review.id, review.comment_count, expected))
+            if fix:
+                Review.objects.filter(pk=review.id).update(
+                    comment_count=expected
+                )
+                fixed.append(review)
+        # update() не отправляет сигналы, поэтому версии ответов с
+        # исправленными отзывами сбрасываются явно.
+        if fixed:
+            invalidate_for_instances(Review, fixed)
+    return drift
+
+
+class Command(BaseCommand):
+    """Класс команды для пересчета и проверки количества комментариев."""
+
+    help = (
+        'Пересчитывает количество комментариев отзывов по сохраненным '
+        'комментариям. Количество отзывов произведений совпадает '
+        'с количеством оценок и пересчитывается командой recalculate_ratings.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, не изменяя данные.',
+        )
+
+    def handle(self, *args, **options):
+        drift = recalculate_comment_counts(fix=not options['check'])
+        for review_id, stored, expected in drift:
+            self.stdout.write(
+                f'Отзыв {review_id}: сохранено комментариев {stored}, '
+                f'фактически {expected}.'
+            )
+        if not drift:
+            self.stdout.write('Расхождений в количестве комментариев нет.')
+        elif options['check']:
+            self.stdout.write(f'Найдено расхождений: {len(drift)}.')
+        else:
+            self.stdout.write(f'Исправлено расхождений: {len(drift)}.')
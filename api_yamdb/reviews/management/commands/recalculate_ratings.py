@@ -0,0 +1,59 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from reviews.models import Review, Title
+
+
+def recalculate_ratings(fix=True):
+    """
+    Функция для пересчета сохраненных рейтингов произведений по отзывам.
+    Возвращает список расхождений в виде кортежей
+    (id произведения, сохраненные значения, фактические значения).
+    """
+    actual = {
+        row['title_id']: (row['rating_sum'], row['rating_count'])
+        for row in Review.objects.order_by()
+        .values('title_id')
+        .annotate(rating_sum=Sum('score'), rating_count=Count('id'))
+    }
+    drift = []
+    with transaction.atomic():
+        for title in Title.objects.only(
+            'id', 'rating_sum', 'rating_count'
+        ).select_for_update():
+            stored = (title.rating_sum, title.rating_count)
+            expected = actual.get(title.id, (0, 0))
+            if stored == expected:
+                continue
+            drift.append((title.id, stored, expected))
+            if fix:
+                title.rating_sum, title.rating_count = expected
+                title.save(update_fields=('rating_sum', 'rating_count'))
+    return drift
+
+
+class Command(BaseCommand):
+    """Класс команды для пересчета и проверки рейтингов произведений."""
+
+    help = 'Пересчитывает рейтинги произведений по сохраненным отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, не изменяя данные.',
+        )
+
+    def handle(self, *args, **options):
+        drift = recalculate_ratings(fix=not options['check'])
+        for title_id, stored, expected in drift:
+            self.stdout.write(
+                f'Произведение {title_id}: сохранено (сумма, количество) '
+                f'{stored}, фактически {expected}.'
+            )
+        if not drift:
+            self.stdout.write('Расхождений в рейтингах не найдено.')
+        elif options['check']:
+            self.stdout.write(f'Найдено расхождений: {len(drift)}.')
+        else:
+            self.stdout.write(f'Исправлено расхождений: {len(drift)}.')
@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 03:29
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_title_rating(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    rows = (
+        Review.objects.order_by()
+        .values('title_id')
+        .annotate(rating_sum=Sum('score'), rating_count=Count('id'))
+    )
+    for row in rows:
+        Title.objects.filter(pk=row['title_id']).update(
+            rating_sum=row['rating_sum'], rating_count=row['rating_count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='Количество оценок'
+            ),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='Сумма оценок'
+            ),
+        ),
+        migrations.RunPython(fill_title_rating, migrations.RunPython.noop),
+    ]
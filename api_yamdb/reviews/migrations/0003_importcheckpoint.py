@@ -0,0 +1,61 @@
+# Generated by Django 3.2 on 2026-10-18 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'model',
+                    models.CharField(
+                        max_length=100, unique=True, verbose_name='Модель'
+                    ),
+                ),
+                (
+                    'file',
+                    models.CharField(
+                        blank=True, max_length=255, verbose_name='Файл'
+                    ),
+                ),
+                (
+                    'offset',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='Обработано строк'
+                    ),
+                ),
+                (
+                    'finished',
+                    models.BooleanField(
+                        default=False, verbose_name='Загрузка завершена'
+                    ),
+                ),
+                (
+                    'updated',
+                    models.DateTimeField(
+                        auto_now=True, verbose_name='Дата обновления'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка загрузки',
+                'verbose_name_plural': 'Контрольные точки загрузки',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2 on 2026-10-18 03:41
+
+from django.db import migrations, models
+from reviews.indexes import create_title_name_index, drop_title_name_index
+
+
+def create_name_index(apps, schema_editor):
+    create_title_name_index(schema_editor.connection)
+
+
+def drop_name_index(apps, schema_editor):
+    drop_title_name_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='genretitle',
+            index=models.Index(
+                fields=['genre', 'title'], name='genretitle_genre_title_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'
+            ),
+        ),
+        migrations.RunPython(create_name_index, drop_name_index),
+    ]
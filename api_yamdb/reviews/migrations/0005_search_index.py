@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 03:45
+
+from django.db import migrations
+from reviews.search import get_search_backend
+
+
+def install_search_index(apps, schema_editor):
+    get_search_backend(schema_editor.connection).install()
+
+
+def uninstall_search_index(apps, schema_editor):
+    get_search_backend(schema_editor.connection).uninstall()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
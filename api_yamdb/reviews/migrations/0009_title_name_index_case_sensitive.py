@@ -0,0 +1,20 @@
+# Generated by Django 3.2 on 2026-10-18 04:45
+
+from django.db import migrations
+from reviews.indexes import create_title_name_index, drop_title_name_index
+
+
+def recreate_name_index(apps, schema_editor):
+    drop_title_name_index(schema_editor.connection)
+    create_title_name_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_pub_date_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(recreate_name_index, migrations.RunPython.noop),
+    ]
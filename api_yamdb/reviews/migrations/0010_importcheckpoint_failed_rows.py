@@ -0,0 +1,20 @@
+# Generated by Django 3.2 on 2026-10-18 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_name_index_case_sensitive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importcheckpoint',
+            name='failed_rows',
+            field=models.JSONField(
+                blank=True, default=list, verbose_name='Строки с ошибками'
+            ),
+        ),
+    ]
@@ -1,10 +1,40 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from users.models import User
 
 from .validators import year_create_validator
 
 
+class CounterFieldsMixin:
+    """
+    Примесь для моделей со счетчиками, которые изменяются выражениями F().
+    Обычное сохранение существующего объекта не записывает поля
+    counter_fields: иначе в базу вернулись бы значения, загруженные вместе
+    с объектом, и изменения счетчиков после загрузки были бы потеряны.
+    Счетчики записываются только при явном указании в update_fields.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
 class Category(models.Model):
     """Модель, описывающая категории произведений."""
 
@@ -47,7 +77,7 @@ class Genre(models.Model):
         verbose_name_plural = 'Жанры'
 
 
-class Title(models.Model):
+class Title(CounterFieldsMixin, models.Model):
     """Модель, описывающая произведения."""
 
     name = models.CharField(
@@ -80,10 +110,42 @@ class Title(models.Model):
         through='GenreTitle',
         verbose_name='Жанры произведения',
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+
+    counter_fields = ('rating_sum', 'rating_count')
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'
+            ),
+        ]
+
+    @property
+    def rating(self):
+        """Средняя оценка произведения, округленная вниз."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum // self.rating_count
+
+    @property
+    def review_count(self):
+        """
+        Количество отзывов. Оценка в отзыве обязательна, поэтому оно
+        совпадает с сохраненным количеством оценок.
+        """
+        return self.rating_count
 
 
 class GenreTitle(models.Model):
@@ -101,9 +163,14 @@ class GenreTitle(models.Model):
     class Meta:
         verbose_name = 'Жанры произведений'
         verbose_name_plural = 'Жанры произведений'
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'], name='genretitle_genre_title_idx'
+            ),
+        ]
 
 
-class Review(models.Model):
+class Review(CounterFieldsMixin, models.Model):
     """Модель, описывающая работу отзывов"""
 
     title = models.ForeignKey(
@@ -129,8 +196,18 @@ class Review(models.Model):
         ],
     )
     pub_date = models.DateTimeField(
-        verbose_name='Дата публикации', auto_now_add=True, db_index=True
+        verbose_name='Дата публикации',
+        default=timezone.now,
+        editable=False,
+        db_index=True,
     )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
+
+    counter_fields = ('comment_count',)
 
     class Meta:
         verbose_name = 'Отзыв'
@@ -142,6 +219,22 @@ class Review(models.Model):
             ),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженную из базы оценку для пересчета рейтинга."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Сохранение выполняется в транзакции, чтобы обновление рейтинга
+        произведения в сигнале post_save было атомарным вместе с отзывом.
+        """
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._loaded_score = self.score
+
 
 class Comment(models.Model):
     """Модель, описывающая работу комментариев"""
@@ -162,10 +255,79 @@ class Comment(models.Model):
         related_name='comments',
     )
     pub_date = models.DateTimeField(
-        verbose_name='Дата публикации', auto_now_add=True, db_index=True
+        verbose_name='Дата публикации',
+        default=timezone.now,
+        editable=False,
+        db_index=True,
     )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['pub_date']
+
+    def save(self, *args, **kwargs):
+        """
+        Сохранение выполняется в транзакции, чтобы обновление количества
+        комментариев отзыва в сигнале post_save было атомарным вместе
+        с комментарием.
+        """
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class ImportCheckpoint(models.Model):
+    """Модель, описывающая прогресс загрузки данных модели из CSV."""
+
+    model = models.CharField(
+        verbose_name='Модель',
+        unique=True,
+        max_length=100,
+    )
+    file = models.CharField(
+        verbose_name='Файл',
+        blank=True,
+        max_length=255,
+    )
+    offset = models.PositiveIntegerField(
+        verbose_name='Обработано строк',
+        default=0,
+    )
+    finished = models.BooleanField(
+        verbose_name='Загрузка завершена',
+        default=False,
+    )
+    failed_rows = models.JSONField(
+        verbose_name='Строки с ошибками',
+        default=list,
+        blank=True,
+    )
+    updated = models.DateTimeField(
+        verbose_name='Дата обновления',
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = 'Контрольная точка загрузки'
+        verbose_name_plural = 'Контрольные точки загрузки'
+
+
+class ContentVersion(models.Model):
+    """
+    Модель, описывающая версию группы ответов API: время последнего
+    изменения данных группы в наносекундах. Хранится в базе, чтобы версия
+    была общей для всех процессов приложения.
+    """
+
+    namespace = models.CharField(
+        verbose_name='Группа ответов',
+        unique=True,
+        max_length=100,
+    )
+    version = models.BigIntegerField(
+        verbose_name='Версия',
+    )
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
@@ -0,0 +1,277 @@
+"""
+Полнотекстовый поиск по названиям и описаниям произведений и текстам
+отзывов.
+
+Бэкенд выбирается по СУБД подключения: в SQLite используется отдельный
+инвертированный индекс FTS5, который обновляется сигналами моделей Title
+и Review, в PostgreSQL - GIN-индексы по tsvector, которые СУБД
+поддерживает сама.
+"""
+import re
+
+from django.db import connection as default_connection
+
+WORD_PATTERN = re.compile(r'\w+')
+SNIPPET_LENGTH = 200
+MAX_RESULTS = 10000
+
+
+class SearchResults:
+    """
+    Ленивый результат поиска: поддерживает count() и срезы, поэтому может
+    передаваться в стандартные классы пагинации DRF.
+    """
+
+    def __init__(self, connection, count_sql, page_sql, params):
+        self.connection = connection
+        self.count_sql = count_sql
+        self.page_sql = page_sql
+        self.params = params
+
+    def count(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(self.count_sql, self.params)
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start = item.start or 0
+        stop = MAX_RESULTS if item.stop is None else item.stop
+        limit = max(stop - start, 0)
+        with self.connection.cursor() as cursor:
+            cursor.execute(self.page_sql, (*self.params, limit, start))
+            return [
+                {
+                    'type': kind,
+                    'id': object_id,
+                    'title_id': title_id,
+                    'snippet': snippet,
+                    'rank': round(score, 4),
+                }
+                for object_id, kind, title_id, snippet, score in cursor
+            ]
+
+
+class EmptySearchResults(list):
+    def count(self):
+        return 0
+
+
+class BaseSearchBackend:
+    """Бэкенд без индекса: поиск не выполняется."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, statements, params=()):
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement, params)
+
+    def installed(self):
+        return False
+
+    def install(self):
+        pass
+
+    def uninstall(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def index_title(self, title):
+        pass
+
+    def index_titles(self, titles):
+        for title in titles:
+            self.index_title(title)
+
+    def remove_title(self, title_id):
+        pass
+
+    def index_review(self, review):
+        pass
+
+    def remove_review(self, review_id):
+        pass
+
+    def search(self, query):
+        return EmptySearchResults()
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Инвертированный индекс FTS5. Произведение хранится в строке с rowid
+    2 * id, отзыв - с rowid 2 * id + 1, поэтому обновление и удаление
+    выполняются по первичному ключу индекса.
+    """
+
+    table = 'reviews_search_index'
+
+    def installed(self):
+        return self.table in self.connection.introspection.table_names()
+
+    def install(self):
+        self.execute((
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5('
+            'kind UNINDEXED, title_id UNINDEXED, name, body, '
+            "tokenize='unicode61 remove_diacritics 2')",
+        ))
+        self.rebuild()
+
+    def uninstall(self):
+        self.execute((f'DROP TABLE IF EXISTS {self.table}',))
+
+    def rebuild(self):
+        self.execute((
+            f'DELETE FROM {self.table}',
+            f'INSERT INTO {self.table}(rowid, kind, title_id, name, body) '
+            "SELECT 2 * id, 'title', id, name, COALESCE(description, '') "
+            'FROM reviews_title',
+            f'INSERT INTO {self.table}(rowid, kind, title_id, name, body) '
+            "SELECT 2 * id + 1, 'review', title_id, '', text "
+            'FROM reviews_review',
+        ))
+
+    def replace(self, rowid, kind, title_id, name, body):
+        self.execute(
+            (
+                f'INSERT OR REPLACE INTO {self.table}'
+                '(rowid, kind, title_id, name, body) '
+                'VALUES (%s, %s, %s, %s, %s)',
+            ),
+            (rowid, kind, title_id, name, body),
+        )
+
+    def delete(self, rowid):
+        self.execute(
+            (f'DELETE FROM {self.table} WHERE rowid = %s',), (rowid,)
+        )
+
+    def index_title(self, title):
+        self.replace(
+            2 * title.pk, 'title', title.pk, title.name,
+            title.description or '',
+        )
+
+    def index_titles(self, titles):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table}'
+                '(rowid, kind, title_id, name, body) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [
+                    (
+                        2 * title.pk, 'title', title.pk, title.name,
+                        title.description or '',
+                    )
+                    for title in titles
+                ],
+            )
+
+    def remove_title(self, title_id):
+        self.delete(2 * title_id)
+
+    def index_review(self, review):
+        self.replace(
+            2 * review.pk + 1, 'review', review.title_id, '', review.text
+        )
+
+    def remove_review(self, review_id):
+        self.delete(2 * review_id + 1)
+
+    def build_query(self, query):
+        """
+        Запрос FTS5 из слов строки поиска: все слова обязательны,
+        последнее слово ищется как префикс.
+        """
+        words = WORD_PATTERN.findall(query)
+        if not words:
+            return None
+        return ' '.join(f'"{word}"' for word in words) + '*'
+
+    def search(self, query):
+        match = self.build_query(query)
+        if match is None:
+            return EmptySearchResults()
+        return SearchResults(
+            self.connection,
+            f'SELECT COUNT(*) FROM {self.table} WHERE {self.table} MATCH %s',
+            f'SELECT rowid / 2, kind, title_id, '
+            f"snippet({self.table}, -1, '', '', '…', 24), "
+            f'-bm25({self.table}, 0, 0, 10.0, 1.0) AS score '
+            f'FROM {self.table} WHERE {self.table} MATCH %s '
+            'ORDER BY score DESC LIMIT %s OFFSET %s',
+            (match,),
+        )
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """
+    Поиск по tsvector с GIN-индексами по выражениям. Индексы обновляются
+    СУБД, поэтому методы индексации объектов ничего не делают.
+    """
+
+    config = 'russian'
+    title_vector = (
+        "to_tsvector('russian', COALESCE(name, '') || ' ' || "
+        "COALESCE(description, ''))"
+    )
+    review_vector = "to_tsvector('russian', text)"
+
+    def install(self):
+        self.execute((
+            'CREATE INDEX IF NOT EXISTS reviews_title_search '
+            f'ON reviews_title USING gin ({self.title_vector})',
+            'CREATE INDEX IF NOT EXISTS reviews_review_search '
+            f'ON reviews_review USING gin ({self.review_vector})',
+        ))
+
+    def uninstall(self):
+        self.execute((
+            'DROP INDEX IF EXISTS reviews_title_search',
+            'DROP INDEX IF EXISTS reviews_review_search',
+        ))
+
+    def search(self, query):
+        if not WORD_PATTERN.search(query):
+            return EmptySearchResults()
+        results = (
+            "SELECT 'title' AS kind, id AS object_id, id AS title_id, "
+            f'LEFT(name, {SNIPPET_LENGTH}) AS snippet, '
+            f'10 * ts_rank({self.title_vector}, query) AS score '
+            f"FROM reviews_title, websearch_to_tsquery('{self.config}', %s) "
+            f'query WHERE {self.title_vector} @@ query '
+            'UNION ALL '
+            "SELECT 'review', id, title_id, "
+            f'LEFT(text, {SNIPPET_LENGTH}), '
+            f'ts_rank({self.review_vector}, query) '
+            f"FROM reviews_review, websearch_to_tsquery('{self.config}', %s) "
+            f'query WHERE {self.review_vector} @@ query'
+        )
+        return SearchResults(
+            self.connection,
+            f'SELECT COUNT(*) FROM ({results}) results',
+            f'SELECT object_id, kind, title_id, snippet, score '
+            f'FROM ({results}) results '
+            'ORDER BY score DESC, kind, object_id LIMIT %s OFFSET %s',
+            (query, query),
+        )
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(connection=None):
+    """Бэкенд поиска для СУБД подключения."""
+    connection = connection or default_connection
+    backend_class = SEARCH_BACKENDS.get(connection.vendor, BaseSearchBackend)
+    return backend_class(connection)
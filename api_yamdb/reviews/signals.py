@@ -0,0 +1,90 @@
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .indexes import restore_title_name_index
+from .models import Comment, Review, Title
+from .search import get_search_backend
+
+
+def change_title_rating(title_id, score_delta, count_delta):
+    """Атомарное изменение суммы и количества оценок произведения."""
+    if not score_delta and not count_delta:
+        return
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    if created:
+        change_title_rating(instance.title_id, instance.score, 1)
+        return
+    loaded_score = getattr(instance, '_loaded_score', None)
+    if loaded_score is None:
+        return
+    change_title_rating(instance.title_id, instance.score - loaded_score, 0)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    change_title_rating(instance.title_id, -instance.score, -1)
+
+
+def change_comment_count(review_id, delta):
+    """Атомарное изменение количества комментариев отзыва."""
+    Review.objects.filter(pk=review_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        change_comment_count(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    change_comment_count(instance.review_id, -1)
+
+
+@receiver(post_save, sender=Title)
+def title_saved_search(sender, instance, **kwargs):
+    get_search_backend().index_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted_search(sender, instance, **kwargs):
+    get_search_backend().remove_title(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+def review_saved_search(sender, instance, **kwargs):
+    get_search_backend().index_review(instance)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted_search(sender, instance, **kwargs):
+    get_search_backend().remove_review(instance.pk)
+
+
+def rebuild_search_index(sender, using, **kwargs):
+    """
+    Перестроение поискового индекса после миграций и очистки базы командой
+    flush, которая не затрагивает таблицу индекса.
+    """
+    backend = get_search_backend(connections[using])
+    if backend.installed():
+        backend.rebuild()
+
+
+def restore_title_index(sender, using, **kwargs):
+    """
+    Восстановление индекса по названию произведения после миграций:
+    SQLite удаляет его триггеры при пересоздании таблицы reviews_title.
+    """
+    restore_title_name_index(connections[using])
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 @admin.register(User)
@@ -17,3 +17,16 @@ class UserAdmin(admin.ModelAdmin):
     list_editable = ('role',)
     search_fields = ('username',)
     list_filter = ('role', 'is_staff')
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'to',
+        'subject',
+        'created',
+        'sent',
+        'attempts',
+    )
+    search_fields = ('to',)
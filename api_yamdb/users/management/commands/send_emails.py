@@ -0,0 +1,111 @@
+import smtplib
+import time
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from users.models import OutgoingEmail
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+
+
+def send_outbox_batch(connection, batch_size=BATCH_SIZE,
+                      max_attempts=MAX_ATTEMPTS):
+    """
+    Функция для отправки пакета писем из очереди через открытое подключение
+    к почтовому серверу. Возвращает количество отправленных писем и
+    ошибку отправки пакета, если она произошла.
+    """
+    with transaction.atomic():
+        batch = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(sent__isnull=True, attempts__lt=max_attempts)
+            .order_by('id')[:batch_size]
+        )
+        if not batch:
+            return 0, None
+        messages = [
+            EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                [email.to],
+                connection=connection,
+            )
+            for email in batch
+        ]
+        emails = OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in batch]
+        )
+        try:
+            connection.send_messages(messages)
+        except (smtplib.SMTPException, OSError) as error:
+            emails.update(attempts=F('attempts') + 1, error=str(error))
+            return 0, error
+        emails.update(
+            attempts=F('attempts') + 1, error='', sent=timezone.now()
+        )
+    return len(batch), None
+
+
+def send_outbox(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Функция для отправки всех писем из очереди. Подключение к почтовому
+    серверу открывается один раз для всех пакетов. При ошибке отправки
+    обработка очереди прекращается до следующего запуска.
+    Возвращает количество отправленных писем и ошибку, если она произошла.
+    """
+    sent = 0
+    with get_connection(fail_silently=False) as connection:
+        while True:
+            count, error = send_outbox_batch(
+                connection, batch_size, max_attempts
+            )
+            sent += count
+            if not count:
+                return sent, error
+
+
+class Command(BaseCommand):
+    """Класс команды для отправки писем из очереди исходящих писем."""
+
+    help = 'Отправляет письма из очереди исходящих писем.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество писем в одном пакете отправки.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='Количество попыток отправки одного письма.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help=(
+                'Интервал проверки очереди в секундах. Без интервала '
+                'команда завершается, когда очередь пуста.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count, error = send_outbox(
+                options['batch_size'], options['max_attempts']
+            )
+            if count:
+                self.stdout.write(f'Отправлено писем: {count}.')
+            if error:
+                self.stderr.write(f'Ошибка отправки писем: {error}.')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
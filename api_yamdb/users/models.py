@@ -81,3 +81,49 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == UserRole.MODERATOR
+
+
+class OutgoingEmail(models.Model):
+    """
+    Модель, описывающая очередь исходящих писем. Письма сохраняются
+    в базу при обработке запроса и отправляются командой send_emails.
+    """
+
+    subject = models.CharField(
+        verbose_name='Тема',
+        max_length=255,
+    )
+    body = models.TextField(
+        verbose_name='Текст',
+    )
+    from_email = models.EmailField(
+        verbose_name='Отправитель',
+        max_length=254,
+    )
+    to = models.EmailField(
+        verbose_name='Получатель',
+        max_length=254,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+    )
+    sent = models.DateTimeField(
+        verbose_name='Дата отправки',
+        null=True,
+        blank=True,
+        db_index=True,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток отправки',
+        default=0,
+    )
+    error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
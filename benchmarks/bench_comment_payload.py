@@ -0,0 +1,68 @@
+"""
+Размер ответа и время GET-запроса к списку комментариев в зависимости от
+формата отзыва в поле review и длины текста отзыва. Формат 'text'
+соответствует прежнему ответу, 'id' - новому ответу по умолчанию.
+
+    python benchmarks/bench_comment_payload.py [длина отзыва ...]
+"""
+import sys
+
+from utils import measure, print_table, setup_database, teardown_database
+
+LENGTHS = (100, 2000, 10000)
+COMMENTS = 10
+FORMATS = ('text', 'excerpt', 'id')
+
+
+def populate(length):
+    from django.contrib.auth import get_user_model
+    from reviews.management.commands.recalculate_comment_counts import (
+        recalculate_comment_counts,
+    )
+    from reviews.models import Category, Comment, Review, Title
+
+    author = get_user_model().objects.create_user(
+        username=f'author{length}', email=f'author{length}@yamdb.fake'
+    )
+    title = Title.objects.create(
+        name=f'Произведение {length}',
+        year=2000,
+        category=Category.objects.get_or_create(
+            name='Книги', slug='books'
+        )[0],
+    )
+    review = Review.objects.create(
+        title=title, author=author, text='x' * length, score=5
+    )
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text=f'Комментарий {idx}')
+        for idx in range(COMMENTS)
+    )
+    # bulk_create не отправляет сигналы, поэтому сохраненное количество
+    # комментариев отзыва (ключ count в ответе) пересчитывается.
+    recalculate_comment_counts()
+    return f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+
+
+def main():
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    lengths = [int(length) for length in sys.argv[1:]] or LENGTHS
+    rows = []
+    for length in lengths:
+        url = populate(length)
+        for review_format in FORMATS:
+            params = {'review': review_format}
+            size = len(client.get(url, params).content)
+            elapsed = measure(lambda: client.get(url, params))
+            rows.append((length, review_format, size, f'{elapsed:.2f}'))
+    print_table(('review length', 'format', 'bytes', 'ms'), rows)
+
+
+if __name__ == '__main__':
+    old_name = setup_database()
+    try:
+        main()
+    finally:
+        teardown_database(old_name)
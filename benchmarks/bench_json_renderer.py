@@ -0,0 +1,77 @@
+"""
+Время рендеринга JSON страниц /api/v1/titles/ и
+/api/v1/titles/{id}/reviews/ разного размера: JSONRenderer DRF против
+FastJSONRenderer (orjson). Данные страниц строятся теми же
+сериализаторами, что и в API.
+
+    python benchmarks/bench_json_renderer.py [размер страницы ...]
+"""
+import sys
+
+from bench_values_serializers import populate
+from utils import measure, print_table, setup_database, teardown_database
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+def paginated(results):
+    return {
+        'count': len(results),
+        'next': 'http://testserver/api/v1/titles/?page=2',
+        'previous': None,
+        'results': results,
+    }
+
+
+def main():
+    from api.v1 import renderers
+    from api.v1.values_serializers import (
+        ReviewValuesSerializer,
+        TitleValuesSerializer,
+    )
+    from rest_framework.renderers import JSONRenderer
+    from reviews.models import Title
+
+    if renderers.orjson is None:
+        print('orjson не установлен, FastJSONRenderer использует json.')
+    page_sizes = [int(size) for size in sys.argv[1:]] or PAGE_SIZES
+    title, _ = populate(max(page_sizes))
+    cases = (
+        ('titles', TitleValuesSerializer, Title.objects.all()),
+        ('reviews', ReviewValuesSerializer, title.reviews.all()),
+    )
+    drf_renderer = JSONRenderer()
+    fast_renderer = renderers.FastJSONRenderer()
+    rows = []
+    for size in page_sizes:
+        for name, serializer_class, queryset in cases:
+            serializer = serializer_class({})
+            data = paginated(
+                serializer.to_representation(
+                    serializer.get_rows(queryset)[:size]
+                )
+            )
+            content = drf_renderer.render(data)
+            assert fast_renderer.render(data) == content
+            drf = measure(lambda: drf_renderer.render(data))
+            fast = measure(lambda: fast_renderer.render(data))
+            rows.append((
+                name,
+                size,
+                len(content),
+                f'{drf:.3f}',
+                f'{fast:.3f}',
+                f'{drf / fast:.1f}x',
+            ))
+    print_table(
+        ('endpoint', 'rows', 'bytes', 'json, ms', 'orjson, ms', 'speedup'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    old_name = setup_database()
+    try:
+        main()
+    finally:
+        teardown_database(old_name)
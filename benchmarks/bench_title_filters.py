@@ -0,0 +1,95 @@
+"""
+Задержка фильтрации произведений в зависимости от размера каталога:
+прежние фильтры (icontains/contains) против TitleFilter с индексами.
+
+    python benchmarks/bench_title_filters.py [размер каталога ...]
+"""
+import random
+import sys
+
+from utils import measure, print_table, setup_database, teardown_database
+
+SIZES = (1000, 10000, 50000)
+WORDS = (
+    'тень', 'ветер', 'город', 'море', 'ночь', 'песня', 'остров', 'звезда',
+    'дорога', 'сад', 'огонь', 'зима', 'река', 'голос', 'время', 'снег',
+)
+
+
+def populate(size, start):
+    from reviews.models import Category, Genre, GenreTitle, Title
+
+    categories = list(Category.objects.all())
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        Title(
+            name=' '.join(random.sample(WORDS, 3)) + f' {idx}',
+            year=random.randint(1900, 2020),
+            category=random.choice(categories),
+        )
+        for idx in range(start, size)
+    )
+    new_ids = Title.objects.filter(id__gt=start).values_list('id', flat=True)
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title_id=title_id, genre=genre)
+        for title_id in new_ids
+        for genre in random.sample(genres, 2)
+    )
+
+
+def page(queryset):
+    return queryset.count(), list(queryset[:10])
+
+
+def main():
+    from api.v1.filters import TitleFilter
+    from reviews.models import Category, Genre, Title
+
+    Category.objects.bulk_create(
+        Category(name=f'Категория {idx}', slug=f'category-{idx}')
+        for idx in range(10)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(20)
+    )
+    cases = (
+        (
+            'category',
+            {'category__slug__icontains': 'category-3'},
+            {'category': 'category-3'},
+        ),
+        (
+            'genre',
+            {'genre__slug__icontains': 'genre-7'},
+            {'genre': 'genre-7'},
+        ),
+        ('name', {'name__contains': 'остров'}, {'name': 'остров'}),
+        (
+            'category+year',
+            {'category__slug__icontains': 'category-3', 'year': 1990},
+            {'category': 'category-3', 'year': 1990},
+        ),
+    )
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    rows = []
+    loaded = 0
+    for size in sizes:
+        populate(size, loaded)
+        loaded = size
+        for name, old_lookup, params in cases:
+            old = measure(
+                lambda: page(Title.objects.filter(**old_lookup))
+            )
+            new = measure(
+                lambda: page(TitleFilter(params, Title.objects.all()).qs)
+            )
+            rows.append((size, name, f'{old:.2f}', f'{new:.2f}'))
+    print_table(('titles', 'filter', 'old, ms', 'new, ms'), rows)
+
+
+if __name__ == '__main__':
+    old_name = setup_database()
+    try:
+        main()
+    finally:
+        teardown_database(old_name)
@@ -0,0 +1,139 @@
+"""
+Скорость сериализации страницы списка (строк в секунду): сериализаторы
+DRF против сериализаторов из values() (api/v1/values_serializers.py).
+Время включает запросы к базе, которые выполняет каждый способ.
+
+    python benchmarks/bench_values_serializers.py [размер страницы ...]
+"""
+import sys
+
+from utils import measure, print_table, setup_database, teardown_database
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+def populate(size):
+    from django.contrib.auth import get_user_model
+    from reviews.models import Category, Comment, Genre, GenreTitle, Review
+    from reviews.models import Title
+
+    category = Category.objects.create(name='Книги', slug='books')
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(3)
+    )
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {idx}',
+            year=2000,
+            description='Описание произведения',
+            category=category,
+            rating_sum=7 * idx,
+            rating_count=idx,
+        )
+        for idx in range(size)
+    )
+    titles = list(Title.objects.all())
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in titles
+        for genre in genres[:2]
+    )
+    user_class = get_user_model()
+    user_class.objects.bulk_create(
+        user_class(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(size)
+    )
+    users = list(user_class.objects.all())
+    Review.objects.bulk_create(
+        Review(title=titles[0], author=user, text='Отзыв ' * 20, score=7)
+        for user in users
+    )
+    review = Review.objects.first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=user, text='Текст комментария')
+        for user in users
+    )
+    return titles[0], review
+
+
+def drf_page(serializer_class, queryset, size, context):
+    return serializer_class(
+        list(queryset[:size]), many=True, context=context
+    ).data
+
+
+def values_page(serializer_class, queryset, size, context):
+    serializer = serializer_class(context)
+    return serializer.to_representation(serializer.get_rows(queryset)[:size])
+
+
+def main():
+    from api.v1.serializers import (
+        CommentSerializer,
+        ReviewSerializer,
+        TitleViewSerializer,
+    )
+    from api.v1.values_serializers import (
+        CommentValuesSerializer,
+        ReviewValuesSerializer,
+        TitleValuesSerializer,
+    )
+    from reviews.models import Title
+
+    page_sizes = [int(size) for size in sys.argv[1:]] or PAGE_SIZES
+    title, review = populate(max(page_sizes))
+    cases = (
+        (
+            'titles',
+            TitleViewSerializer,
+            TitleValuesSerializer,
+            Title.objects.select_related('category').prefetch_related(
+                'genre'
+            ),
+        ),
+        (
+            'reviews',
+            ReviewSerializer,
+            ReviewValuesSerializer,
+            title.reviews.select_related('author', 'title'),
+        ),
+        (
+            'comments',
+            CommentSerializer,
+            CommentValuesSerializer,
+            review.comments.select_related('author'),
+        ),
+    )
+    context = {'review_format': 'id'}
+    rows = []
+    for size in page_sizes:
+        for name, drf_class, values_class, queryset in cases:
+            assert drf_page(drf_class, queryset, size, context) == (
+                values_page(values_class, queryset, size, context)
+            )
+            drf = measure(
+                lambda: drf_page(drf_class, queryset, size, context), 5
+            )
+            values = measure(
+                lambda: values_page(values_class, queryset, size, context), 5
+            )
+            rows.append((
+                name,
+                size,
+                f'{size / drf * 1000:.0f}',
+                f'{size / values * 1000:.0f}',
+                f'{drf / values:.1f}x',
+            ))
+    print_table(
+        ('endpoint', 'rows', 'drf, rows/s', 'values, rows/s', 'speedup'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    old_name = setup_database()
+    try:
+        main()
+    finally:
+        teardown_database(old_name)
@@ -0,0 +1,56 @@
+"""
+Общие функции для бенчмарков. Бенчмарки запускаются из корня проекта:
+
+    python benchmarks/<имя файла>.py
+
+и работают на временной тестовой базе, которая удаляется после запуска.
+"""
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+
+def setup_database():
+    """Настройка Django и создание тестовой базы."""
+    import django
+
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    return old_name
+
+
+def teardown_database(old_name):
+    from django.db import connection
+
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def measure(func, repeat=20):
+    """Медиана времени выполнения func в миллисекундах."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def print_table(header, rows):
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(header, *rows)
+    ]
+    for row in (header, *rows):
+        print('  '.join(str(v).rjust(w) for v, w in zip(row, widths)))
@@ -381,3 +381,34 @@ class Test06CommentAPI:
             'Проверьте, что DELETE-запрос неавторизованного пользователя к '
             f'`{url}` возвращает ответ со статусом 401.'
         )
+
+    def test_07_comment_review_format(self, admin_client, admin, settings):
+        from reviews.models import Review
+
+        settings.COMMENT_REVIEW_EXCERPT_LENGTH = 20
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        long_text = 'очень длинный отзыв ' * 50
+        Review.objects.filter(pk=reviews[0]['id']).update(text=long_text)
+        url = '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        expected = {
+            '': reviews[0]['id'],
+            '?review=id': reviews[0]['id'],
+            '?review=excerpt': 'очень длинный отзыв…',
+            '?review=text': long_text,
+        }
+        for params, review in expected.items():
+            response = admin_client.get(url + params)
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['results'][0]['review'] == review, (
+                f'Проверьте, что GET-запрос к `{url}{params}` возвращает '
+                'отзыв в поле `review` в запрошенном формате.'
+            )
+        response = admin_client.get(url + '?review=html')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что GET-запрос с неизвестным форматом отзыва '
+            'возвращает ответ со статусом 400.'
+        )
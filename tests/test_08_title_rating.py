@@ -0,0 +1,162 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 5
+
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/',
+            data={'score': 10}
+        )
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        )
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'каскадном удалении отзывов.'
+        )
+
+    def test_02_recalculate_ratings(self, admin_client, admin, user_client,
+                                    user):
+        from reviews.models import Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        Title.objects.filter(pk=title_id).update(rating_sum=0, rating_count=0)
+
+        call_command('recalculate_ratings', '--check')
+        assert self.get_rating(admin_client, title_id) is None
+
+        call_command('recalculate_ratings')
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'рейтинг произведения по отзывам.'
+        )
+
+    def test_03_stored_counts(self, admin_client, admin, user_client, user):
+        from reviews.models import Review
+
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for client in (admin_client, user_client, user_client):
+            client.post(comments_url, data={'text': 'Комментарий'})
+
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['review_count'] == 2, (
+            'Проверьте, что ответ на GET-запрос к произведению содержит '
+            'количество отзывов в поле `review_count`.'
+        )
+        response = admin_client.get(f'{reviews_url}{reviews[0]["id"]}/')
+        assert response.json()['comment_count'] == 3, (
+            'Проверьте, что ответ на GET-запрос к отзыву содержит '
+            'количество комментариев в поле `comment_count`.'
+        )
+
+        comment_id = admin_client.get(comments_url).json()['results'][0]['id']
+        admin_client.delete(f'{comments_url}{comment_id}/')
+        results = admin_client.get(reviews_url).json()['results']
+        assert results[0]['comment_count'] == 2, (
+            'Проверьте, что количество комментариев в списке отзывов '
+            'обновляется при удалении комментария.'
+        )
+
+        user.delete()
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 0, (
+            'Проверьте, что количество комментариев пересчитывается при '
+            'каскадном удалении комментариев.'
+        )
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['review_count'] == 1
+
+        Review.objects.filter(pk=reviews[0]['id']).update(comment_count=7)
+        call_command('recalculate_comment_counts', '--check')
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 7
+        etag = admin_client.get(reviews_url)['ETag']
+        call_command('recalculate_comment_counts')
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 0, (
+            'Проверьте, что команда `recalculate_comment_counts` '
+            'восстанавливает количество комментариев отзывов.'
+        )
+        response = admin_client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что команда `recalculate_comment_counts` меняет '
+            'ETag списка исправленных отзывов.'
+        )
+
+    def test_04_stale_title_save(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        user_client.post(
+            f'/api/v1/titles/{title.pk}/reviews/',
+            data={'text': 'Отзыв', 'score': 9},
+        )
+        title.name = 'Терминатор 2'
+        title.save()
+        saved = Title.objects.get(pk=title.pk)
+        assert (saved.rating_sum, saved.rating_count) == (9, 1), (
+            'Проверьте, что сохранение ранее загруженного произведения не '
+            'затирает рейтинг, измененный после загрузки.'
+        )
+        assert saved.name == 'Терминатор 2'
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.pk}/', data={'year': 1991}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title.pk) == 9
+
+    def test_05_stale_review_save(self, admin_client, admin, user_client,
+                                  user):
+        from reviews.models import Review
+
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        review = Review.objects.get(pk=reviews[0]['id'])
+        user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.pk}/'
+            'comments/',
+            data={'text': 'Комментарий'},
+        )
+        review.text = 'Новый текст'
+        review.save()
+        saved = Review.objects.get(pk=review.pk)
+        assert saved.comment_count == 1, (
+            'Проверьте, что сохранение ранее загруженного отзыва не '
+            'затирает количество комментариев, измененное после загрузки.'
+        )
+        assert saved.text == 'Новый текст'
+        assert self.get_rating(admin_client, titles[0]['id']) == 5
@@ -0,0 +1,295 @@
+import pytest
+
+from tests.utils import create_extra_titles, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    @pytest.mark.parametrize('extra_titles', (0, 8))
+    def test_01_titles_list(self, client, admin_client,
+                            django_assert_num_queries, extra_titles):
+        create_titles(admin_client)
+        create_extra_titles(admin_client, extra_titles)
+
+        # Версии данных, страница произведений с категориями и жанры
+        # страницы: список помещается на одну страницу, COUNT не нужен.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == 2 + extra_titles
+
+    def test_02_title_detail(self, client, admin_client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+
+        with django_assert_num_queries(3):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+
+    def test_03_review_create_title_lookups(self, admin_client, user_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Отзыв', 'score': 8}
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == 201
+        title_selects = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title"' in query['sql']
+        ]
+        assert len(title_selects) == 1, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            'из базы один раз.'
+        )
+
+        response = user_client.post(url, data=data)
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ответ со статусом 400.'
+        )
+
+    def test_04_write_permissions_without_user_loads(
+            self, admin_client, admin, user_client, user, moderator_client,
+            moderator):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from tests.utils import create_comments
+
+        author_map = {
+            admin: admin_client, user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comment_url = f'{review_url}{reviews[0]["id"]}/comments/'
+
+        requests = (
+            (user_client.patch, f'{review_url}{reviews[0]["id"]}/',
+             {'text': 'Чужой отзыв'}, 403),
+            (user_client.delete, f'{comment_url}{comments[0]["id"]}/',
+             None, 403),
+            (user_client.delete, f'{comment_url}{comments[1]["id"]}/',
+             None, 204),
+            (moderator_client.delete, f'{comment_url}{comments[0]["id"]}/',
+             None, 204),
+            (moderator_client.delete, f'{review_url}{reviews[1]["id"]}/',
+             None, 204),
+            (admin_client.delete, f'{review_url}{reviews[2]["id"]}/',
+             None, 204),
+            (admin_client.post, '/api/v1/categories/',
+             {'name': 'Музыка', 'slug': 'music'}, 201),
+            (admin_client.delete, '/api/v1/categories/music/', None, 204),
+            (admin_client.post, '/api/v1/genres/',
+             {'name': 'Рок', 'slug': 'rock'}, 201),
+            (admin_client.delete, '/api/v1/genres/rock/', None, 204),
+            (admin_client.patch, f'/api/v1/titles/{titles[1]["id"]}/',
+             {'name': 'Новое название'}, 200),
+            (admin_client.delete, f'/api/v1/titles/{titles[1]["id"]}/',
+             None, 204),
+        )
+        for method, url, data, expected_status in requests:
+            with CaptureQueriesContext(connection) as context:
+                response = method(url, data=data)
+            assert response.status_code == expected_status, url
+            user_selects = [
+                query for query in context.captured_queries
+                if 'FROM "users_user"' in query['sql']
+            ]
+            assert len(user_selects) == 1, (
+                f'Проверьте, что проверка прав при запросе к `{url}` не '
+                'загружает пользователей из базы: допустим только запрос '
+                'аутентификации.'
+            )
+
+    def seed_list_endpoints(self, django_user_model, size):
+        from reviews.models import Category, Comment, Genre, Review, Title
+
+        users = [
+            django_user_model.objects.create_user(
+                username=f'reader{idx}', email=f'reader{idx}@yamdb.fake'
+            )
+            for idx in range(size)
+        ]
+        categories = [
+            Category.objects.create(name=f'Категория {idx}', slug=f'c{idx}')
+            for idx in range(size)
+        ]
+        genres = [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'g{idx}')
+            for idx in range(size)
+        ]
+        titles = []
+        for idx in range(size):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000,
+                category=categories[idx]
+            )
+            title.genre.set(genres[:2])
+            titles.append(title)
+        reviews = [
+            Review.objects.create(
+                title=titles[0], author=user, text='Отзыв', score=5
+            )
+            for user in users
+        ]
+        for user in users:
+            Comment.objects.create(
+                review=reviews[0], author=user, text='Комментарий'
+            )
+        return titles[0].pk, reviews[0].pk
+
+    def count_list_queries(self, client, url):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        cache.clear()
+        # COUNT выполняется, только если есть следующая страница, поэтому
+        # он отключен: проверяются запросы на объекты страницы.
+        separator = '&' if '?' in url else '?'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}{separator}count=false')
+        assert response.status_code == 200, url
+        return len(context.captured_queries), len(response.json()['results'])
+
+    def test_05_list_queries_do_not_scale(self, admin_client,
+                                          django_user_model):
+        from reviews.models import Category, Genre, Title
+
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/titles/{title_id}/reviews/',
+            '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            '/api/v1/users/',
+        )
+        counts = {}
+        for size in (2, 10):
+            title_id, review_id = self.seed_list_endpoints(
+                django_user_model, size
+            )
+            for url in urls:
+                counts.setdefault(url, []).append(self.count_list_queries(
+                    admin_client,
+                    url.format(title_id=title_id, review_id=review_id)
+                ))
+            django_user_model.objects.filter(
+                username__startswith='reader'
+            ).delete()
+            Title.objects.all().delete()
+            Category.objects.all().delete()
+            Genre.objects.all().delete()
+        for url, ((small, small_len), (large, large_len)) in counts.items():
+            assert small_len < large_len, url
+            assert small == large, (
+                f'Количество запросов к базе при GET-запросе к `{url}` '
+                f'растет с размером страницы: {small} для {small_len} '
+                f'объектов, {large} для {large_len} объектов.'
+            )
+
+    def test_06_sparse_fieldsets(self, client, admin_client, admin,
+                                 django_assert_num_queries):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?fields=id,name,rating'
+        # Версии данных и страница произведений без JOIN категорий и без жанров.
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(context.captured_queries) == 2
+        page_sql = context.captured_queries[-1]['sql']
+        assert 'reviews_category' not in page_sql
+        assert 'description' not in page_sql
+        assert set(response.json()['results'][0]) == {'id', 'name', 'rating'}
+
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/?omit=genre,description'
+        )
+        assert set(response.json()) == {
+            'id', 'name', 'year', 'rating', 'review_count', 'category'
+        }
+
+        response = client.get('/api/v1/titles/?fields=id,budget')
+        assert response.status_code == 400, (
+            'Проверьте, что запрос неизвестного поля в параметре fields '
+            'возвращает ответ со статусом 400.'
+        )
+
+        review = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 7},
+        ).json()
+        comment_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+            'comments/'
+        )
+        admin_client.post(comment_url, data={'text': 'Комментарий'})
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/?fields=id,score'
+            )
+        assert response.json()['results'] == [
+            {'id': review['id'], 'score': 7}
+        ]
+        assert 'users_user' not in context.captured_queries[-1]['sql']
+
+        response = client.get(comment_url + '?omit=review,pub_date')
+        assert set(response.json()['results'][0]) == {'id', 'text', 'author'}
+
+        response = admin_client.get('/api/v1/users/?fields=username')
+        assert response.json()['results'] == [{'username': admin.username}]
+
+    def test_07_values_serialization(self, client, admin_client, settings):
+        from django.core.cache import cache
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.create(name='Без категории', year=1999)
+        reviews = []
+        for idx, title in enumerate(titles):
+            review = admin_client.post(
+                f'/api/v1/titles/{title["id"]}/reviews/',
+                data={'text': f'Отзыв {idx} ' * 30, 'score': 3 + idx},
+            ).json()
+            reviews.append(review)
+            admin_client.post(
+                f'/api/v1/titles/{title["id"]}/reviews/{review["id"]}/'
+                'comments/',
+                data={'text': f'Комментарий {idx}'},
+            )
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comment_url = f'{review_url}{reviews[0]["id"]}/comments/'
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?cursor=',
+            '/api/v1/titles/?genre=horror',
+            '/api/v1/titles/?fields=id,genre,rating',
+            '/api/v1/titles/?omit=genre',
+            review_url,
+            review_url + '?cursor=',
+            review_url + '?fields=title,pub_date',
+            comment_url,
+            comment_url + '?review=text',
+            comment_url + '?review=excerpt&omit=text',
+            comment_url + '?cursor=&fields=id',
+        )
+        for url in urls:
+            settings.API_VALUES_SERIALIZATION = False
+            cache.clear()
+            expected = client.get(url)
+            settings.API_VALUES_SERIALIZATION = True
+            cache.clear()
+            response = client.get(url)
+            assert response.status_code == 200, url
+            assert response.content == expected.content, (
+                f'Проверьте, что ответ на GET-запрос к `{url}`, построенный '
+                'из values(), совпадает с ответом сериализатора DRF.'
+            )
@@ -0,0 +1,167 @@
+import smtplib
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10EmailDelivery:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_outbox_signup(self, client, settings):
+        from users.models import OutgoingEmail
+
+        settings.CONFIRMATION_EMAIL_DELIVERY = 'outbox'
+        outbox_before_count = len(mail.outbox)
+        for idx in range(3):
+            response = client.post(self.url_signup, data={
+                'email': f'valid{idx}@yamdb.fake',
+                'username': f'valid_username{idx}'
+            })
+            assert response.status_code == 200
+
+        assert len(mail.outbox) == outbox_before_count, (
+            'Если письма отправляются через очередь, они не должны '
+            'отправляться при обработке запроса.'
+        )
+        assert OutgoingEmail.objects.filter(sent__isnull=True).count() == 3
+
+        call_command('send_emails', '--batch-size', '2')
+        assert len(mail.outbox) == outbox_before_count + 3, (
+            'Проверьте, что команда `send_emails` отправляет все письма '
+            'из очереди.'
+        )
+        assert {message.to[0] for message in mail.outbox} >= {
+            f'valid{idx}@yamdb.fake' for idx in range(3)
+        }
+        assert not OutgoingEmail.objects.filter(sent__isnull=True).exists()
+
+    def test_02_batch_signup(self, client, settings):
+        from api.v1.utils import email_dispatcher
+
+        settings.CONFIRMATION_EMAIL_DELIVERY = 'batch'
+        settings.CONFIRMATION_EMAIL_BATCH_WINDOW = 5
+        settings.CONFIRMATION_EMAIL_BATCH_SIZE = 3
+        outbox_before_count = len(mail.outbox)
+        batches_before_count = email_dispatcher.metrics['batches']
+        for idx in range(3):
+            response = client.post(self.url_signup, data={
+                'email': f'valid{idx}@yamdb.fake',
+                'username': f'valid_username{idx}'
+            })
+            assert response.status_code == 200
+
+        email_dispatcher.flush()
+        assert len(mail.outbox) == outbox_before_count + 3, (
+            'Проверьте, что в режиме `batch` отправляются все письма.'
+        )
+        assert email_dispatcher.metrics['batches'] == (
+            batches_before_count + 1
+        ), 'Проверьте, что письма отправляются одним пакетом.'
+        assert email_dispatcher.metrics['last_batch_size'] == 3
+
+    def test_03_batch_retry(self, settings, monkeypatch):
+        from api.v1 import utils
+        from users.models import OutgoingEmail
+
+        settings.CONFIRMATION_EMAIL_BATCH_RETRIES = 2
+        settings.CONFIRMATION_EMAIL_BATCH_RETRY_DELAY = 0
+        failures = [smtplib.SMTPServerDisconnected('Соединение разорвано')]
+        get_connection = utils.get_connection
+
+        def flaky_connection(**kwargs):
+            if failures:
+                raise failures.pop()
+            return get_connection(**kwargs)
+
+        monkeypatch.setattr(utils, 'get_connection', flaky_connection)
+        dispatcher = utils.EmailBatchDispatcher()
+        outbox_before_count = len(mail.outbox)
+        dispatcher.send_batch(
+            [
+                EmailMessage(
+                    'Код', 'Текст', 'no-reply@yamdb.com', ['a@yamdb.fake']
+                )
+            ]
+        )
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что в режиме `batch` отправка пакета повторяется '
+            'после ошибки.'
+        )
+        assert dispatcher.metrics['errors'] == 1
+        assert dispatcher.metrics['batches'] == 1
+        assert not OutgoingEmail.objects.exists()
+
+    def test_04_batch_fallback_to_outbox(self, settings, monkeypatch):
+        from api.v1 import utils
+        from users.models import OutgoingEmail
+
+        settings.CONFIRMATION_EMAIL_BATCH_RETRIES = 2
+        settings.CONFIRMATION_EMAIL_BATCH_RETRY_DELAY = 0
+
+        def broken_connection(**kwargs):
+            raise smtplib.SMTPServerDisconnected('Соединение разорвано')
+
+        monkeypatch.setattr(utils, 'get_connection', broken_connection)
+        dispatcher = utils.EmailBatchDispatcher()
+        outbox_before_count = len(mail.outbox)
+        dispatcher.send_batch(
+            [
+                EmailMessage(
+                    'Код', f'Текст {idx}', 'no-reply@yamdb.com',
+                    [f'valid{idx}@yamdb.fake'],
+                )
+                for idx in range(2)
+            ]
+        )
+        assert dispatcher.metrics['errors'] == 3, (
+            'Проверьте, что число повторных попыток отправки пакета '
+            'ограничено настройкой CONFIRMATION_EMAIL_BATCH_RETRIES.'
+        )
+        assert dispatcher.metrics['outbox'] == 2
+        assert OutgoingEmail.objects.filter(sent__isnull=True).count() == 2, (
+            'Проверьте, что письма, которые не удалось отправить в режиме '
+            '`batch`, сохраняются в очередь писем.'
+        )
+
+        call_command('send_emails')
+        assert {message.to[0] for message in mail.outbox[
+            outbox_before_count:
+        ]} == {'valid0@yamdb.fake', 'valid1@yamdb.fake'}
+
+    def test_05_outbox_closes_thread_connection(self, settings, monkeypatch):
+        import threading
+
+        from api.v1 import utils
+        from users.models import OutgoingEmail
+
+        settings.CONFIRMATION_EMAIL_BATCH_RETRIES = 0
+        settings.CONFIRMATION_EMAIL_BATCH_RETRY_DELAY = 0
+        settings.CONFIRMATION_EMAIL_BATCH_WINDOW = 0
+
+        def broken_connection(**kwargs):
+            raise smtplib.SMTPServerDisconnected('Соединение разорвано')
+
+        closed_in = []
+        close_all = utils.connections.close_all
+
+        def record_close_all():
+            closed_in.append(threading.current_thread().name)
+            close_all()
+
+        monkeypatch.setattr(utils, 'get_connection', broken_connection)
+        monkeypatch.setattr(utils.connections, 'close_all', record_close_all)
+        dispatcher = utils.EmailBatchDispatcher()
+        dispatcher.send(
+            EmailMessage(
+                'Код', 'Текст', 'no-reply@yamdb.com', ['valid@yamdb.fake']
+            )
+        )
+        dispatcher.flush()
+        assert OutgoingEmail.objects.filter(to='valid@yamdb.fake').exists()
+        assert closed_in == ['email-batch-dispatcher'], (
+            'Проверьте, что фоновый поток отправки писем закрывает свое '
+            'подключение к базе после записи в очередь писем.'
+        )
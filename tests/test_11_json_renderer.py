@@ -0,0 +1,96 @@
+import datetime
+import decimal
+import io
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_reviews
+
+DATA = {
+    'count': 1,
+    'next': None,
+    'results': [
+        {
+            'id': 1,
+            'name': 'Произведение\u2028\u2029',
+            'rating': None,
+            'score': 7.5,
+            'price': decimal.Decimal('10.50'),
+            'pub_date': datetime.datetime(
+                2022, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc
+            ),
+            'date': datetime.date(2022, 1, 2),
+            'message': gettext_lazy('This field is required.'),
+            'errors': [ErrorDetail('Ошибка', code='invalid')],
+            'genre': ({'name': 'Драма', 'slug': 'drama'},),
+            5: 'ключ-число',
+            'big': 2 ** 70,
+        }
+    ],
+}
+
+
+class Test11JSONRenderer:
+
+    def test_01_render_matches_drf(self):
+        from api.v1.renderers import FastJSONRenderer
+
+        renderer = FastJSONRenderer()
+        assert renderer.render(DATA) == JSONRenderer().render(DATA)
+        data = dict(DATA, results=[dict(DATA['results'][0], big=1)])
+        assert renderer.render(data) == JSONRenderer().render(data), (
+            'Проверьте, что FastJSONRenderer возвращает тот же JSON, '
+            'что и JSONRenderer из DRF.'
+        )
+        assert renderer.render(
+            data, 'application/json; indent=4'
+        ) == JSONRenderer().render(data, 'application/json; indent=4')
+        assert renderer.render(None) == b''
+
+    def test_02_fallback_without_orjson(self, monkeypatch):
+        from api.v1 import parsers, renderers
+
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert renderers.FastJSONRenderer().render(DATA) == (
+            JSONRenderer().render(DATA)
+        )
+        assert parsers.FastJSONParser().parse(io.BytesIO(b'[1]')) == [1]
+
+    def test_03_parse(self):
+        from api.v1.parsers import FastJSONParser
+
+        body = '{"text": "Отзыв", "score": 7}'
+        for encoding in ('utf-8', 'utf-16'):
+            stream = io.BytesIO(body.encode(encoding))
+            context = {'encoding': encoding}
+            assert FastJSONParser().parse(stream, None, context) == (
+                JSONParser().parse(io.BytesIO(body.encode(encoding)), None,
+                                   context)
+            )
+        for body in (b'{"text": ', b'NaN'):
+            with pytest.raises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_api_json_body(self, admin_client, admin, user_client, user):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data='{"text": "Отзыв в JSON", "score": 8}',
+            content_type='application/json',
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что API принимает тело запроса в формате JSON.'
+        )
+        assert response.json()['text'] == 'Отзыв в JSON'
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data='{"text": ',
+            content_type='application/json',
+        )
+        assert response.status_code == 400
@@ -0,0 +1,251 @@
+import json
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+
+from tests.utils import create_titles
+
+BULK_URL = '/api/v1/titles/bulk/'
+
+
+def make_titles(count, start=0):
+    return [
+        {
+            'name': f'Произведение {idx}',
+            'year': 2000 + idx,
+            'genre': ['horror', 'drama'],
+            'category': 'films',
+        }
+        for idx in range(start, start + count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Bulk:
+
+    @pytest.mark.parametrize('count', (1, 20))
+    def test_01_bulk_create_titles(self, admin_client, count,
+                                   django_assert_max_num_queries):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        data = make_titles(count)
+        # Запросы не зависят от размера пакета: жанры и категории пакета,
+        # вставка произведений, ключи, связи с жанрами, ответ.
+        with django_assert_max_num_queries(16):
+            response = admin_client.post(BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос администратора к '
+            '`/api/v1/titles/bulk/` с корректными данными возвращает ответ со статусом 201.'
+        )
+        results = response.json()
+        assert [title['name'] for title in results] == [
+            title['name'] for title in data
+        ], (
+            'Проверьте, что ответ на пакетное создание содержит созданные '
+            'объекты в порядке запроса.'
+        )
+        for result in results:
+            title = Title.objects.get(pk=result['id'])
+            assert title.name == result['name']
+            assert set(title.genre.values_list('slug', flat=True)) == {
+                'horror', 'drama'
+            }
+            assert result['category'] == 'films'
+        search = admin_client.get('/api/v1/search/?q=Произведение')
+        assert search.json()['count'] == count, (
+            'Проверьте, что произведения, созданные пакетно, попадают '
+            'в поисковый индекс.'
+        )
+
+    def test_02_bulk_create_ndjson(self, admin_client):
+        create_titles(admin_client)
+        body = '\n'.join(
+            json.dumps(title, ensure_ascii=False) for title in make_titles(3)
+        )
+        response = admin_client.post(
+            BULK_URL,
+            data=body.encode('utf-8'),
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что эндпоинт `/api/v1/titles/bulk/` принимает пакет '
+            'в формате NDJSON.'
+        )
+        assert len(response.json()) == 3
+
+        response = admin_client.post(
+            BULK_URL,
+            data=b'{"name": "a"}\n{broken',
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'строка 2' in response.json()['detail']
+
+    def test_03_bulk_validation_errors(self, admin_client):
+        from reviews.models import Category, Title
+
+        create_titles(admin_client)
+        titles_count = Title.objects.count()
+        data = make_titles(3)
+        data[1]['genre'] = ['horror', 'unknown']
+        data[2]['year'] = 'год'
+        response = admin_client.post(BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {}, (
+            'Проверьте, что ответ 400 на пакетный запрос содержит пустой '
+            'словарь для корректных элементов.'
+        )
+        assert 'genre' in errors[1]
+        assert 'year' in errors[2]
+        assert Title.objects.count() == titles_count, (
+            'Проверьте, что при ошибке в одном элементе пакета ничего '
+            'не записывается.'
+        )
+
+        response = admin_client.post(
+            '/api/v1/categories/bulk/',
+            data=[
+                {'name': 'Музыка', 'slug': 'music'},
+                {'name': 'Фильмы', 'slug': 'films'},
+                {'name': 'Музыка 2', 'slug': 'music'},
+            ],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'slug' in errors[1] and 'slug' in errors[2], (
+            'Проверьте, что пакетное создание проверяет уникальность slug '
+            'как среди существующих объектов, так и внутри пакета.'
+        )
+        assert not Category.objects.filter(slug='music').exists()
+
+        response = admin_client.post(BULK_URL, data={}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_bulk_update(self, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        data = [
+            {'id': titles[0]['id'], 'genre': ['comedy', 'drama']},
+            {'id': titles[1]['id'], 'name': 'Крепкий орешек 2'},
+        ]
+        response = admin_client.patch(BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что PATCH-запрос администратора к '
+            '`/api/v1/titles/bulk/` возвращает ответ со статусом 200.'
+        )
+        first = Title.objects.get(pk=titles[0]['id'])
+        assert set(first.genre.values_list('slug', flat=True)) == {
+            'comedy', 'drama'
+        }
+        assert first.name == titles[0]['name']
+        second = Title.objects.get(pk=titles[1]['id'])
+        assert second.name == 'Крепкий орешек 2'
+        assert set(second.genre.values_list('slug', flat=True)) == {'drama'}
+
+        response = admin_client.patch(
+            BULK_URL,
+            data=[{'id': titles[0]['id'], 'name': 'Новое'}, {'id': 10 ** 6}],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()[1] == {'id': ['Объект не найден.']}
+        assert Title.objects.get(pk=titles[0]['id']).name == titles[0]['name']
+
+        response = admin_client.patch(
+            BULK_URL,
+            data=[
+                {'id': titles[0]['id'], 'name': 'Первое'},
+                {'id': titles[0]['id'], 'name': 'Второе'},
+            ],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пакетное изменение отклоняет пакет, в котором '
+            'один объект указан несколько раз.'
+        )
+        assert response.json() == [
+            {}, {'id': ['Объект повторяется в пакете.']}
+        ]
+        assert Title.objects.get(pk=titles[0]['id']).name == titles[0]['name']
+
+        response = admin_client.patch(
+            '/api/v1/genres/bulk/',
+            data=[{'slug': 'drama', 'name': 'Драмы'}],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = admin_client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json()['genre'] == [
+            {'name': 'Драмы', 'slug': 'drama'}
+        ], (
+            'Проверьте, что пакетное изменение сбрасывает кэш ответов.'
+        )
+
+    def test_05_bulk_destroy(self, admin_client):
+        from reviews.models import Genre, Title
+
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.delete(
+            BULK_URL, data=[title['id'] for title in titles], format='json'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Title.objects.exists()
+
+        response = admin_client.delete(
+            '/api/v1/genres/bulk/', data=['horror', 'missing'], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert Genre.objects.filter(slug='horror').exists()
+
+        response = admin_client.delete(
+            '/api/v1/genres/bulk/', data=['horror', 'horror'], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()[1] == {'slug': ['Объект повторяется в пакете.']}
+        assert Genre.objects.filter(slug='horror').exists()
+
+    def test_06_bulk_permissions(self, client, user_client, admin_client):
+        create_titles(admin_client)
+        data = make_titles(1)
+        for api_client in (client, user_client):
+            response = api_client.post(
+                BULK_URL,
+                data=json.dumps(data),
+                content_type='application/json',
+            )
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), (
+                'Проверьте, что пакетная запись доступна только '
+                'администратору.'
+            )
+
+    def test_07_bulk_create_requires_returned_pks(self, monkeypatch):
+        from api.v1 import bulk
+        from django.db import NotSupportedError
+        from reviews.models import Category
+
+        monkeypatch.setattr(
+            bulk,
+            'connection',
+            SimpleNamespace(
+                vendor='mysql',
+                features=SimpleNamespace(
+                    can_return_rows_from_bulk_insert=False
+                ),
+            ),
+        )
+        with pytest.raises(NotSupportedError):
+            bulk.bulk_create_with_pks(
+                Category, [Category(name='Музыка', slug='music')]
+            )
+        assert not Category.objects.exists(), (
+            'Проверьте, что ключи созданных объектов читаются из таблицы '
+            'только в SQLite.'
+        )
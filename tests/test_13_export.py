@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+# Ресурс выгрузки и ключ файла в settings.PATH_CSV_FILES.
+FILES = {
+    'category': 'category',
+    'genre': 'genre',
+    'titles': 'title',
+    'genre_title': 'genretitle',
+    'users': 'user',
+    'review': 'review',
+    'comments': 'comment',
+}
+
+
+def export(client, resource, export_format='csv'):
+    response = client.get(f'/api/v1/export/{resource}.{export_format}')
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос администратора к '
+        f'`/api/v1/export/{resource}.{export_format}` возвращает ответ '
+        f'со статусом 200.'
+    )
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдается потоковым ответом.'
+    )
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+def read_csv(content):
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Export:
+
+    def test_01_export_permissions(self, client, user_client, admin_client):
+        for api_client in (client, user_client):
+            response = api_client.get('/api/v1/export/titles.csv')
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), 'Проверьте, что выгрузка доступна только администратору.'
+        for url in ('/api/v1/export/ratings.csv',
+                    '/api/v1/export/titles.xml'):
+            assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_export_titles(self, admin_client, admin, user_client, user,
+                              settings, django_assert_max_num_queries):
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        rows = read_csv(export(admin_client, 'titles'))
+        assert list(rows[0]) == [
+            'id', 'name', 'year', 'category', 'description'
+        ], (
+            'Проверьте, что столбцы выгрузки произведений совпадают '
+            'с файлом titles.csv.'
+        )
+        assert [int(row['id']) for row in rows] == sorted(
+            title['id'] for title in titles
+        )
+
+        settings.API_EXPORT_CHUNK_SIZE = 1
+        # Произведения читаются пакетами, жанры - запросом на пакет.
+        with django_assert_max_num_queries(len(titles) + 3):
+            content = export(admin_client, 'titles', 'ndjson')
+        records = [json.loads(line) for line in content.splitlines()]
+        assert len(records) == len(titles)
+        first = records[0]
+        assert first['rating'] == 5 and len(first['genre']) == 2, (
+            'Проверьте, что выгрузка произведений в NDJSON содержит '
+            'жанры и рейтинг.'
+        )
+
+    def test_03_export_import_round_trip(self, admin_client, admin,
+                                         user_client, user, settings,
+                                         tmp_path):
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title)
+        from users.models import User
+
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        exported = {}
+        paths = {}
+        for resource, key in FILES.items():
+            exported[resource] = export(admin_client, resource)
+            path = tmp_path / f'{resource}.csv'
+            path.write_text(exported[resource], encoding='utf-8')
+            paths[key] = str(path)
+        settings.PATH_CSV_FILES = paths
+        titles_ndjson = export(admin_client, 'titles', 'ndjson')
+
+        for model in (Comment, Review, GenreTitle, Title, Genre, Category,
+                      User):
+            model.objects.all().delete()
+        call_command('load_data_from_csv', workers=1)
+
+        for resource in FILES:
+            assert export(admin_client, resource) == exported[resource], (
+                f'Проверьте, что выгрузка `{resource}` загружается '
+                f'командой load_data_from_csv без изменений.'
+            )
+        assert export(admin_client, 'titles', 'ndjson') == titles_ndjson
@@ -0,0 +1,292 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import CommandError, call_command
+
+# Заголовки CSV-файлов по ключам settings.PATH_CSV_FILES.
+HEADERS = {
+    'category': 'id,name,slug',
+    'genre': 'id,name,slug',
+    'title': 'id,name,year,category',
+    'genretitle': 'id,title_id,genre_id',
+    'user': 'id,username,email,role,bio,first_name,last_name',
+    'review': 'id,title_id,text,author,score,pub_date',
+    'comment': 'id,review_id,text,author,pub_date',
+}
+TITLES = [
+    '1,Побег из Шоушенка,1994,1',
+    '2,Крестный отец,1972,99',
+    '3,Криминальное чтиво,1994,1',
+    '1,Бойцовский клуб,1999,1',
+    '5,Форрест Гамп,1994,1',
+]
+
+
+def write_csv(path, key, rows):
+    path.write_text(
+        '\n'.join([HEADERS[key], *rows]) + '\n', encoding='utf-8'
+    )
+
+
+def write_files(tmp_path, settings, **rows):
+    paths = {}
+    for key in HEADERS:
+        path = tmp_path / f'{key}.csv'
+        write_csv(path, key, rows.get(key, []))
+        paths[key] = str(path)
+    settings.PATH_CSV_FILES = paths
+    return paths
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14LoadData:
+
+    def test_01_skip_only_bad_rows(self, settings, tmp_path, capsys):
+        from reviews.models import Category, ImportCheckpoint, Title
+
+        paths = write_files(
+            tmp_path, settings, category=['1,Фильм,movie'], title=TITLES
+        )
+        call_command('load_data_from_csv', batch_size=3, workers=1)
+        assert set(Title.objects.values_list('id', flat=True)) == {1, 3, 5}, (
+            'Проверьте, что команда load_data_from_csv пропускает только '
+            'ошибочные строки, а остальные строки пакета загружает.'
+        )
+        output = capsys.readouterr().out
+        assert (
+            'Category с id=99 не найден. Строка 2 в Title не загружена.'
+            in output
+        ), 'Проверьте, что отчет содержит номер ошибочной строки и причину.'
+        assert 'Строка 4 в Title не загружена.' in output
+        assert 'Данные в Title загружены, строк: 3' in output
+        checkpoint = ImportCheckpoint.objects.get(model='reviews.Title')
+        assert checkpoint.finished and checkpoint.offset == len(TITLES)
+        assert checkpoint.failed_rows == [[2, 2], [4, 4]], (
+            'Проверьте, что номера ошибочных строк сохраняются '
+            'в контрольной точке.'
+        )
+
+        Category.objects.create(id=99, name='Книга', slug='book')
+        fixed = list(TITLES)
+        fixed[3] = '4,Бойцовский клуб,1999,1'
+        write_csv(tmp_path / 'title.csv', 'title', fixed)
+        call_command(
+            'load_data_from_csv', batch_size=3, workers=1, resume=True
+        )
+        assert set(Title.objects.values_list('id', flat=True)) == {
+            1, 2, 3, 4, 5
+        }, (
+            'Проверьте, что с --resume повторно загружаются строки, '
+            'которые не загрузились ранее.'
+        )
+        output = capsys.readouterr().out
+        assert 'Данные в Title загружены, строк: 2' in output
+        assert 'Данные в Category загружены, строк: 0' in output
+        checkpoint.refresh_from_db()
+        assert checkpoint.failed_rows == []
+        assert checkpoint.file == paths['title']
+
+    def test_02_resume_interrupted_load(self, settings, tmp_path):
+        from reviews.management.commands.load_data_from_csv import (
+            KnownIds, load_model)
+        from reviews.models import Category, ImportCheckpoint, Title
+
+        paths = write_files(tmp_path, settings, title=TITLES[:3])
+        Category.objects.create(id=1, name='Фильм', slug='movie')
+        Category.objects.create(id=99, name='Книга', slug='book')
+        ImportCheckpoint.objects.create(
+            model='reviews.Title',
+            file=paths['title'],
+            offset=2,
+            failed_rows=[[1, 1]],
+        )
+        loaded, errors = load_model(
+            Title, paths['title'], KnownIds(), batch_size=1, resume=True
+        )
+        assert (loaded, errors) == (2, [])
+        assert set(Title.objects.values_list('id', flat=True)) == {1, 3}, (
+            'Проверьте, что прерванная загрузка продолжается после '
+            'контрольной точки и повторяет только ошибочные строки.'
+        )
+        checkpoint = ImportCheckpoint.objects.get(model='reviews.Title')
+        assert checkpoint.finished and checkpoint.failed_rows == []
+
+        loaded, _ = load_model(Title, paths['title'], KnownIds(), resume=True)
+        assert loaded == 0, (
+            'Проверьте, что завершенная загрузка без ошибок не повторяется '
+            'с --resume.'
+        )
+
+    def test_03_dependencies(self, monkeypatch):
+        from reviews.management.commands import load_data_from_csv
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title)
+        from users.models import User
+
+        assert load_data_from_csv.get_dependencies(
+            load_data_from_csv.CLASSES
+        ) == {
+            Category: set(),
+            Genre: set(),
+            Title: {Category},
+            GenreTitle: {Genre, Title},
+            User: set(),
+            Review: {Title, User},
+            Comment: {Review, User},
+        }, (
+            'Проверьте, что модель загружается после всех моделей, '
+            'на которые она ссылается.'
+        )
+        assert load_data_from_csv.get_dependencies([Title, Review]) == {
+            Title: set(),
+            Review: {Title},
+        }, 'Проверьте, что учитываются только загружаемые модели.'
+
+        def get_dependencies(classes):
+            dependencies = {model_class: set() for model_class in classes}
+            dependencies.update({Category: {Title}, Title: {Category}})
+            return dependencies
+
+        monkeypatch.setattr(
+            load_data_from_csv, 'get_dependencies', get_dependencies
+        )
+        monkeypatch.setattr(
+            load_data_from_csv,
+            'load_model_timed',
+            lambda *args: (0, [], 0.0),
+        )
+        with pytest.raises(CommandError, match='Циклическая зависимость'):
+            load_data_from_csv.load_data(workers=1)
+
+    def test_04_parallel_load(self, monkeypatch):
+        from reviews.management.commands import load_data_from_csv
+        from reviews.models import Category, Genre
+        from users.models import User
+
+        monkeypatch.setattr(
+            load_data_from_csv, 'connection', SimpleNamespace(vendor='sqlite')
+        )
+        assert load_data_from_csv.get_workers(4) == 1, (
+            'Проверьте, что для SQLite модели загружаются последовательно.'
+        )
+        monkeypatch.setattr(
+            load_data_from_csv,
+            'connection',
+            SimpleNamespace(vendor='postgresql'),
+        )
+        assert load_data_from_csv.get_workers(4) == 4
+        assert load_data_from_csv.get_workers(0) == 1
+
+        independent = {Category, Genre, User}
+        barrier = threading.Barrier(len(independent), timeout=5)
+        lock = threading.Lock()
+        events = []
+
+        def load_model_timed(model_class, known_ids, batch_size, resume):
+            with lock:
+                events.append(('start', model_class))
+            if model_class in independent:
+                # Ждет, пока начнется загрузка всех независимых моделей.
+                barrier.wait()
+            with lock:
+                events.append(('end', model_class))
+            return 0, [], 0.0
+
+        monkeypatch.setattr(
+            load_data_from_csv, 'load_model_timed', load_model_timed
+        )
+        load_data_from_csv.load_data(workers=3)
+        assert {
+            model_class for event, model_class in events[:3]
+        } == independent and all(
+            event == 'start' for event, _ in events[:3]
+        ), (
+            'Проверьте, что при --workers>1 независимые модели '
+            'загружаются параллельно.'
+        )
+        dependencies = load_data_from_csv.get_dependencies(
+            load_data_from_csv.CLASSES
+        )
+        for index, (event, model_class) in enumerate(events):
+            if event == 'start':
+                finished = {
+                    loaded for done, loaded in events[:index]
+                    if done == 'end'
+                }
+                assert dependencies[model_class] <= finished, (
+                    f'Проверьте, что {model_class.__qualname__} '
+                    f'загружается после моделей, на которые ссылается.'
+                )
+
+    def test_05_foreign_values(self, django_assert_num_queries):
+        from reviews.management.commands.load_data_from_csv import (
+            KnownIds, change_foreign_values, get_foreign_keys)
+        from reviews.models import Category, Review, Title
+        from users.models import User
+
+        user = User.objects.create(username='author', email='a@yamdb.com')
+        Category.objects.create(id=1, name='Фильм', slug='movie')
+        known_ids = KnownIds()
+        with django_assert_num_queries(1):
+            assert str(user.pk) in known_ids[User]
+            assert str(user.pk) in known_ids[User]
+        assert known_ids[Category] == {'1'}, (
+            'Проверьте, что KnownIds хранит id связанных объектов строками, '
+            'как в CSV.'
+        )
+
+        foreign_keys = get_foreign_keys(Review)
+        title = Title.objects.create(name='Побег', year=1994, category_id=1)
+        for column in ('author', 'author_id'):
+            row = {'id': '1', column: str(user.pk), 'title_id': str(title.pk)}
+            assert change_foreign_values(row, foreign_keys, known_ids) == {
+                'id': '1',
+                'author_id': str(user.pk),
+                'title_id': str(title.pk),
+            }, (
+                f'Проверьте, что столбец `{column}` загружается в поле '
+                f'author_id.'
+            )
+
+        with pytest.raises(ValueError, match='User с id=404 не найден'):
+            change_foreign_values(
+                {'author': '404', 'title_id': str(title.pk)},
+                foreign_keys,
+                known_ids,
+            )
+
+        row = {'id': '2', 'name': 'Без категории', 'category': ''}
+        assert change_foreign_values(
+            row, get_foreign_keys(Title), known_ids
+        ) == {'id': '2', 'name': 'Без категории', 'category_id': None}, (
+            'Проверьте, что пустой внешний ключ загружается как NULL.'
+        )
+
+    def test_06_load_changes_etags(self, client, settings, tmp_path):
+        write_files(tmp_path, settings)
+        url = '/api/v1/categories/'
+        etag = client.get(url)['ETag']
+
+        write_files(
+            tmp_path, settings,
+            category=['1,Фильм,movie', '2,Книга,book', '3,Музыка,music'],
+            title=['1,Побег из Шоушенка,1994,1'],
+        )
+        call_command('load_data_from_csv', workers=1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после загрузки данных командой '
+            'load_data_from_csv ETag ответов меняется.'
+        )
+        assert response.json()['count'] == 3
+        reviews_etag = client.get('/api/v1/titles/1/reviews/')['ETag']
+
+        call_command('load_data_from_csv', workers=1)
+        response = client.get(
+            '/api/v1/titles/1/reviews/', HTTP_IF_NONE_MATCH=reviews_etag
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что загрузка меняет ETag ответов вложенных '
+            'ресурсов загруженных произведений.'
+        )
@@ -0,0 +1,40 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Cache:
+
+    def test_01_catalog_cache(self, client, admin_client,
+                              django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/titles/?year=1984')
+
+        # Только версии данных из базы.
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 2
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/titles/?year=1984')
+        assert response.json()['results'][0]['rating'] is None
+
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 3, (
+            'Проверьте, что кэш списка категорий сбрасывается при '
+            'добавлении категории.'
+        )
+
+        admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 8}
+        )
+        response = client.get('/api/v1/titles/?year=1984')
+        assert response.json()['results'][0]['rating'] == 8, (
+            'Проверьте, что кэш списка произведений сбрасывается при '
+            'изменении рейтинга.'
+        )
@@ -0,0 +1,120 @@
+import pytest
+
+from tests.utils import create_extra_titles, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ConditionalGet:
+
+    def test_01_conditional_get(self, client, admin_client,
+                                django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+
+        # Произведение и версии данных из базы.
+        with django_assert_num_queries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 8})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после добавления отзыва ETag списка отзывов '
+            'меняется.'
+        )
+        assert response.json()['count'] == 1
+        assert response['ETag'] != etag
+
+    def test_02_validators_shared_between_processes(self, client,
+                                                    admin_client,
+                                                    monkeypatch):
+        from api.v1 import cache
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        assert client.get('/api/v1/titles/').json()['count'] == 2
+
+        # Кэш другого процесса не узнает о записи.
+        monkeypatch.setattr(cache, 'invalidate_namespace', lambda ns: None)
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 8})
+        create_extra_titles(admin_client, 1)
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag строится по версиям данных, общим для '
+            'всех процессов, а не по локальному кэшу.'
+        )
+        assert response.json()['count'] == 1
+        assert client.get('/api/v1/titles/').json()['count'] == 3, (
+            'Проверьте, что кэшированный ответ не отдается после '
+            'изменения данных в другом процессе.'
+        )
+
+    def test_03_if_none_match_any(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            HTTP_IF_NONE_MATCH='*',
+        )
+        assert response.status_code == 304
+        assert response['ETag']
+        response = client.get(
+            '/api/v1/titles/99999/reviews/', HTTP_IF_NONE_MATCH='*'
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что `If-None-Match: *` не совпадает с '
+            'несуществующим ресурсом.'
+        )
+
+    def test_04_reads_do_not_create_versions(self, client, admin_client,
+                                             admin, user_client, user):
+        from reviews.models import ContentVersion, Title
+
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        Title.objects.create(name='Без отзывов', year=2000)
+        versions_count = ContentVersion.objects.count()
+        urls = [
+            f'/api/v1/titles/{10 ** 6 + idx}/reviews/' for idx in range(5)
+        ] + [
+            f'/api/v1/titles/{title_id}/reviews/{10 ** 6 + idx}/comments/'
+            for idx in range(5)
+        ]
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH='"etag"')
+            assert response.status_code == 404, url
+        for title in Title.objects.all():
+            response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+            assert response.status_code == 200
+        assert ContentVersion.objects.count() == versions_count, (
+            'Проверьте, что GET-запросы не создают версии данных в базе.'
+        )
+
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        admin_client.post(
+            f'{reviews_url}{reviews[0]["id"]}/comments/',
+            data={'text': 'Комментарий'},
+        )
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        assert not ContentVersion.objects.filter(
+            namespace__in=[
+                f'reviews:{title_id}',
+                *(f'comments:{review["id"]}' for review in reviews),
+            ]
+        ).exists(), (
+            'Проверьте, что версии вложенных ресурсов удаляются вместе '
+            'с объектом.'
+        )
@@ -0,0 +1,76 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleFilters:
+
+    def test_01_title_filters(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        for query, expected in (
+            ('name=орешек', ['Крепкий орешек']),
+            ('name=Кре', ['Крепкий орешек']),
+            ('name=кре', []),
+            ('name=Кр', ['Крепкий орешек']),
+            ('name=кр', []),
+            ('name=ep', []),
+            ('name=Te', []),
+            ('genre=drama', ['Крепкий орешек']),
+            ('genre=dram', []),
+            ('genre_prefix=dram', ['Крепкий орешек']),
+            ('category=films&year=1984', ['Терминатор']),
+            ('category_prefix=f', ['Терминатор']),
+        ):
+            response = client.get(f'{url}?{query}')
+            names = [title['name'] for title in response.json()['results']]
+            assert names == expected, (
+                f'Проверьте фильтрацию произведений по запросу `{query}`.'
+            )
+
+    def test_02_name_index_after_table_rebuild(self, client, admin_client):
+        from django.apps import apps
+        from django.db import connection
+        from django.db.models.signals import post_migrate
+        from reviews.indexes import (TITLE_NAME_FTS_TRIGGERS,
+                                     title_name_fts_available)
+        from reviews.models import Title
+
+        if not title_name_fts_available(connection):
+            pytest.skip('SQLite собран без FTS5 с триграммным токенизатором.')
+        create_titles(admin_client)
+        # Пересоздание таблицы в миграции удаляет ее триггеры.
+        with connection.cursor() as cursor:
+            for trigger in TITLE_NAME_FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {trigger}')
+        Title.objects.create(name='Чужие', year=1986)
+        assert not title_name_fts_available(connection)
+        response = client.get('/api/v1/titles/?name=Чуж')
+        assert [title['name'] for title in response.json()['results']] == [
+            'Чужие'
+        ], (
+            'Проверьте, что без триггеров индекса фильтр по названию '
+            'не использует устаревший индекс.'
+        )
+
+        app_config = apps.get_app_config('reviews')
+        post_migrate.send(
+            sender=app_config,
+            app_config=app_config,
+            using=connection.alias,
+            verbosity=0,
+            interactive=False,
+            plan=[],
+            apps=apps,
+        )
+        assert title_name_fts_available(connection), (
+            'Проверьте, что индекс по названию восстанавливается после '
+            'миграций.'
+        )
+        Title.objects.create(name='Чужой', year=1979)
+        response = client.get('/api/v1/titles/?name=Чуж')
+        assert sorted(
+            title['name'] for title in response.json()['results']
+        ) == ['Чужие', 'Чужой']
@@ -0,0 +1,43 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Search:
+
+    def test_01_search(self, client, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'Лучший боевик про Терминатора', 'score': 9}
+        )
+        url = '/api/v1/search/'
+
+        response = client.get(f'{url}?q=термин')
+        data = response.json()
+        assert data['count'] == 2, (
+            f'Проверьте, что `{url}` ищет по названиям произведений и '
+            'текстам отзывов.'
+        )
+        assert data['results'][0]['type'] == 'title', (
+            'Проверьте, что совпадение в названии произведения выше '
+            'совпадения в тексте отзыва.'
+        )
+        assert data['results'][0]['id'] == titles[0]['id']
+
+        response = client.get(f'{url}?q=Yippie')
+        assert [
+            (result['type'], result['id'])
+            for result in response.json()['results']
+        ] == [('title', titles[1]['id'])]
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        response = client.get(f'{url}?q=термин')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что поисковый индекс обновляется при изменении и '
+            'удалении произведений и отзывов.'
+        )
@@ -0,0 +1,251 @@
+import pytest
+
+from tests.utils import create_extra_titles, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Pagination:
+
+    def test_01_titles_cursor_pagination(self, client, admin_client,
+                                         django_assert_num_queries):
+        create_titles(admin_client)
+        create_extra_titles(admin_client, 12)
+
+        # Версии данных, без COUNT: страница произведений с категориями и жанры страницы.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/?cursor=')
+        data = response.json()
+        assert 'count' not in data
+        assert len(data['results']) == 10
+        assert data['previous'] is None
+
+        response = client.get(data['next'])
+        next_data = response.json()
+        assert len(next_data['results']) == 4
+        assert next_data['next'] is None
+        ids = [title['id'] for title in data['results'] + next_data['results']]
+        assert ids == sorted(set(ids)), (
+            'Проверьте, что курсорная пагинация возвращает произведения '
+            'в порядке возрастания id без повторов.'
+        )
+
+    def test_02_page_size(self, client, admin_client, settings,
+                          django_assert_num_queries):
+        from api.v1.pagination import PageSizePagination
+
+        create_titles(admin_client)
+        create_extra_titles(admin_client, 13)
+
+        response = client.get('/api/v1/titles/?page_size=12')
+        data = response.json()
+        assert data['count'] == 15
+        assert len(data['results']) == 12, (
+            'Проверьте, что параметр `page_size` задает размер страницы.'
+        )
+        assert 'page_size=12' in data['next']
+
+        max_page_size = PageSizePagination.max_page_size
+        PageSizePagination.max_page_size = 4
+        try:
+            response = client.get('/api/v1/titles/?page_size=100')
+        finally:
+            PageSizePagination.max_page_size = max_page_size
+        assert len(response.json()['results']) == 4, (
+            'Проверьте, что размер страницы ограничен API_MAX_PAGE_SIZE.'
+        )
+
+        response = client.get('/api/v1/titles/?page_size=4&cursor=')
+        assert len(response.json()['results']) == 4
+
+        for idx in range(12):
+            admin_client.post('/api/v1/genres/', data={
+                'name': f'Жанр {idx}', 'slug': f'genre-{idx}'
+            })
+        response = client.get('/api/v1/genres/')
+        assert len(response.json()['results']) == 15, (
+            'Проверьте, что размер страницы жанров по умолчанию больше 10.'
+        )
+
+        # Версии данных, без COUNT: страница произведений с категориями и жанры.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/?count=false&page_size=10')
+        data = response.json()
+        assert 'count' not in data
+        assert len(data['results']) == 10
+        assert data['previous'] is None
+        response = client.get(data['next'])
+        next_data = response.json()
+        assert len(next_data['results']) == 5
+        assert next_data['next'] is None
+        assert 'page=' not in next_data['previous']
+        assert response.status_code == 200
+        response = client.get('/api/v1/titles/?count=false&page=3')
+        assert response.status_code == 404
+
+        response = client.get('/api/v1/titles/?page=last&page_size=4')
+        assert response.status_code == 200, (
+            'Проверьте, что параметр `page=last` возвращает последнюю '
+            'страницу.'
+        )
+        data = response.json()
+        assert len(data['results']) == 3 and data['next'] is None
+        assert 'page=3' in data['previous']
+
+        response = client.get(
+            '/api/v1/titles/?page_size=4&page=2', HTTP_ACCEPT='text/html'
+        )
+        content = response.content.decode()
+        assert 'class="pagination' in content, (
+            'Проверьте, что browsable API выводит ссылки на страницы.'
+        )
+        assert 'page=4' in content
+
+    def test_03_count_strategies(self, client, admin_client, monkeypatch,
+                                 django_assert_num_queries):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from api.v1 import counts
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 5})
+
+        # Версии данных, произведение и страница отзывов: количество хранится в Title.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.json()['count'] == 1
+
+        with CaptureQueriesContext(connection) as context:
+            assert client.get('/api/v1/genres/').json()['count'] == 3
+        assert not [
+            query for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ], (
+            'Проверьте, что для списка, который помещается на одну '
+            'страницу, количество объектов не подсчитывается запросом.'
+        )
+
+        create_extra_titles(admin_client, 2)
+        url = '/api/v1/titles/?year=2000&page_size=1'
+        with CaptureQueriesContext(connection) as context:
+            assert admin_client.get(url).json()['count'] == 2
+            assert admin_client.get(url).json()['count'] == 2
+        count_queries = [
+            query for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ]
+        assert len(count_queries) == 1, (
+            'Проверьте, что количество объектов отфильтрованного списка '
+            'произведений сохраняется в кэше.'
+        )
+        create_extra_titles(admin_client, 1)
+        assert admin_client.get(url).json()['count'] == 3, (
+            'Проверьте, что сохраненное количество объектов сбрасывается '
+            'при изменении произведений.'
+        )
+
+        monkeypatch.setattr(
+            counts, 'estimate_table_rows', lambda queryset: 500000
+        )
+        response = admin_client.get('/api/v1/titles/?page_size=1')
+        assert response.json()['count'] == 500000
+        assert admin_client.get(url).json()['count'] == 3
+        # На последней странице количество известно точно.
+        assert admin_client.get('/api/v1/titles/').json()['count'] == 5
+
+    def test_04_drifted_counts(self, client, admin_client, admin,
+                               user_client, user, monkeypatch):
+        from api.v1 import counts
+        from reviews.models import Review, Title
+
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for api_client in (admin_client, user_client):
+            api_client.post(comments_url, data={'text': 'Комментарий'})
+
+        Review.objects.filter(pk=reviews[0]['id']).update(comment_count=0)
+        data = client.get(comments_url).json()
+        assert len(data['results']) == 2 and data['count'] == 2, (
+            'Проверьте, что сохраненное количество комментариев, '
+            'расходящееся с фактическим, не скрывает комментарии.'
+        )
+
+        Title.objects.filter(pk=title_id).update(rating_count=1)
+        data = client.get(f'{reviews_url}?page_size=1').json()
+        assert len(data['results']) == 1 and data['next'], (
+            'Проверьте, что следующая страница определяется по данным, '
+            'а не по сохраненному количеству.'
+        )
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 1 and data['count'] == 2
+
+        monkeypatch.setattr(counts, 'estimate_table_rows', lambda qs: 0)
+        monkeypatch.setattr(
+            counts.EstimatedCount, 'count', lambda self, qs, view: 1
+        )
+        data = client.get('/api/v1/titles/?page_size=1').json()
+        assert data['next'], (
+            'Проверьте, что заниженная оценка количества не скрывает '
+            'следующие страницы.'
+        )
+        response = client.get('/api/v1/titles/?page_size=1&page=2')
+        assert response.status_code == 200
+        assert response.json()['count'] == 2
+
+    def test_05_cursor_ties(self, client, admin_client, admin, settings):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Comment
+
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        for idx in range(7):
+            admin_client.post(url, data={'text': f'Комментарий {idx}'})
+        comments = list(Comment.objects.order_by('id'))
+        Comment.objects.filter(pk__in=[c.pk for c in comments[:5]]).update(
+            pub_date=comments[0].pub_date
+        )
+        expected = [comment.pk for comment in comments]
+
+        for values_serialization in (False, True):
+            settings.API_VALUES_SERIALIZATION = values_serialization
+            cache.clear()
+            ids = []
+            pages = []
+            next_url = f'{url}?cursor=&page_size=2'
+            with CaptureQueriesContext(connection) as context:
+                while next_url:
+                    data = client.get(next_url).json()
+                    pages.append(data)
+                    ids += [comment['id'] for comment in data['results']]
+                    next_url = data['next']
+            assert ids == expected, (
+                'Проверьте, что курсорная пагинация не пропускает и не '
+                'повторяет комментарии с одинаковой датой публикации.'
+            )
+            assert not [
+                query for query in context.captured_queries
+                if 'OFFSET' in query['sql']
+            ], 'Проверьте, что курсорная пагинация не использует OFFSET.'
+
+            previous_ids = []
+            previous_url = pages[-1]['previous']
+            while previous_url:
+                data = client.get(previous_url).json()
+                previous_ids = [
+                    comment['id'] for comment in data['results']
+                ] + previous_ids
+                previous_url = data['previous']
+            assert previous_ids == expected[:-1], (
+                'Проверьте, что ссылки `previous` курсорной пагинации '
+                'возвращают предыдущие страницы по порядку.'
+            )
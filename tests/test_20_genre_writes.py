@@ -0,0 +1,82 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20GenreWrites:
+
+    @pytest.mark.parametrize('genre_count', (1, 6))
+    def test_01_title_genre_writes(self, admin_client, genre_count):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Genre, GenreTitle
+
+        create_titles(admin_client)
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(6)
+        )
+        slugs = [f'genre-{idx}' for idx in range(genre_count)]
+        data = {
+            'name': 'Новое произведение',
+            'year': 2000,
+            'genre': slugs,
+            'category': 'films',
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                '/api/v1/titles/', data=data, format='json'
+            )
+        assert response.status_code == 201
+        genre_queries = [
+            query for query in context.captured_queries
+            if 'FROM "reviews_genre" WHERE' in query['sql']
+        ]
+        assert len(genre_queries) == 1, (
+            'Проверьте, что все жанры произведения загружаются одним '
+            'запросом независимо от их количества.'
+        )
+
+        title_id = response.json()['id']
+        url = f'/api/v1/titles/{title_id}/'
+        response = admin_client.patch(
+            url, data={'genre': ['genre-0', 'missing', 'other']},
+            format='json',
+        )
+        assert response.status_code == 400
+        errors = response.json()['genre']
+        assert len(errors) == 2 and 'missing' in errors[0], (
+            'Проверьте, что ошибка выводится для каждого несуществующего '
+            'slug жанра.'
+        )
+
+        kept = set(
+            GenreTitle.objects.filter(
+                title_id=title_id, genre__slug='genre-0'
+            ).values_list('pk', flat=True)
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                url, data={'genre': ['genre-0', 'horror']}, format='json'
+            )
+        assert response.status_code == 200
+        deletes = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('DELETE')
+        ]
+        assert len(deletes) == (1 if genre_count > 1 else 0), (
+            'Проверьте, что при изменении жанров произведения удаляются '
+            'только убранные связи.'
+        )
+        assert kept <= set(
+            GenreTitle.objects.filter(title_id=title_id).values_list(
+                'pk', flat=True
+            )
+        ), 'Проверьте, что связи с оставшимися жанрами не пересоздаются.'
+        assert set(
+            GenreTitle.objects.filter(title_id=title_id).values_list(
+                'genre__slug', flat=True
+            )
+        ) == {'genre-0', 'horror'}
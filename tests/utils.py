@@ -243,6 +243,16 @@ def create_titles(admin_client):
     return result, categories, genres
 
 
+def create_extra_titles(admin_client, count):
+    for idx in range(count):
+        admin_client.post('/api/v1/titles/', data={
+            'name': f'Произведение {idx}',
+            'year': 2000,
+            'genre': ['horror', 'comedy'],
+            'category': 'films',
+        })
+
+
 def create_reviews(admin_client, authors_map):
     titles, _, _ = create_titles(admin_client)
     result = []